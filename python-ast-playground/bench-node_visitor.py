@@ -0,0 +1,276 @@
+"""
+This file provides a benchmark suite for CustomNodeVisitor
+in the custom_node_visitor package.
+
+It runs the visitor over synthetic modules of controlled shape
+(wide, deep, call-heavy, doc-heavy) and over the standard library
+sources, and reports nodes/sec, the parse and visit time split,
+and peak memory. The token-level fast path is cross-checked against
+the full visitor on the standard library sources.
+
+Usage:
+    python bench-node_visitor.py [--size N] [--repeat R]
+                                 [--stdlib-limit K] [--json]
+"""
+import argparse
+import ast
+import json
+import sys
+import sysconfig
+import time
+import tracemalloc
+
+import custom_node_visitor
+# Imported lazily by the package, measure_fast reads its categories.
+import custom_node_visitor.fastpath
+
+
+# *** synthetic sources from here ***
+
+def wide_source(size: int) -> str:
+    """
+    Many small top-level functions.
+
+    Parameters:
+    - size(int): Number of functions.
+    """
+    return "".join(
+        f"def f{i}(a, b):\n    c = a + b\n    return c\n\n"
+        for i in range(size))
+
+
+def deep_source(size: int) -> str:
+    """
+    Deeply nested blocks holding long BinOp chains.
+
+    Parameters:
+    - size(int): Total number of terms in the chains.
+    """
+    # The parser limits nesting to 100 blocks and about 1000 operators.
+    depth = 90
+    terms = 1000
+    lines = [
+        "    " * level + f"for i{level} in range({level}):"
+        for level in range(depth)]
+    chain = " + ".join(f"x{i}" for i in range(terms))
+    lines.extend(
+        "    " * depth + f"total = {chain}"
+        for _ in range(max(1, size // terms)))
+    return "\n".join(lines) + "\n"
+
+
+def call_heavy_source(size: int) -> str:
+    """
+    Statements made of function and method calls.
+
+    Parameters:
+    - size(int): Number of statements.
+    """
+    return "".join(
+        f"print(len(items{i}), obj.method{i % 7}(str(i), "
+        f"'{{}}'.format({i})))\n"
+        for i in range(size))
+
+
+def doc_heavy_source(size: int) -> str:
+    """
+    Classes and methods which all have docstrings.
+
+    Parameters:
+    - size(int): Number of classes.
+    """
+    doc = "\n".join(f"        Line {i} of the docstring." for i in range(8))
+    return "".join(
+        f"class C{i}:\n    '''\n    Class {i}.\n    '''\n\n"
+        f"    def method(self):\n        '''\n{doc}\n        '''\n"
+        f"        return {i}\n\n"
+        for i in range(size))
+
+
+SYNTHETIC = {
+    "wide": wide_source,
+    "deep": deep_source,
+    "call_heavy": call_heavy_source,
+    "doc_heavy": doc_heavy_source,
+}
+
+
+# *** measurement from here ***
+
+def measure(module, sources: list[str], repeat: int) -> dict:
+    """
+    Measures parse and visit time of the sources, keeping the best
+    of repeat runs, and peak memory in a separate traced run.
+
+    Parameters:
+    - module: The custom_node_visitor package.
+    - sources: Source strings to parse and visit.
+    - repeat(int): Number of timed runs.
+
+    Returns:
+    - Dictionary of the measured values.
+    """
+    visitor_class = module.CustomNodeVisitor
+    # Created without a script, so that visit only walks the tree.
+    visitor = visitor_class()
+    best_parse = best_visit = float("inf")
+    nodes = 0
+    for _ in range(repeat):
+        parse_time = visit_time = 0.0
+        nodes = 0
+        for source in sources:
+            start = time.perf_counter()
+            tree = ast.parse(source)
+            parse_time += time.perf_counter() - start
+            visitor.reset()
+            start = time.perf_counter()
+            visitor.visit(tree)
+            visit_time += time.perf_counter() - start
+            nodes += visitor.sum
+        best_parse = min(best_parse, parse_time)
+        best_visit = min(best_visit, visit_time)
+    tracemalloc.start()
+    for source in sources:
+        visitor_class.from_source(source)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    total = best_parse + best_visit
+    return {
+        "files": len(sources),
+        "bytes": sum(len(source) for source in sources),
+        "nodes": nodes,
+        "parse_s": round(best_parse, 6),
+        "visit_s": round(best_visit, 6),
+        "nodes_per_s": round(nodes / total) if total else 0,
+        "visit_nodes_per_s": round(nodes / best_visit) if best_visit else 0,
+        "peak_bytes": peak,
+    }
+
+
+def measure_fast(module, sources: list[str], repeat: int) -> dict:
+    """
+    Compares the fast path with the full visitor for the categories
+    it supports, keeping the best of repeat runs, and counts
+    the sources whose results differ.
+
+    Parameters:
+    - module: The custom_node_visitor package.
+    - sources: Source strings to count.
+    - repeat(int): Number of timed runs.
+
+    Returns:
+    - Dictionary of the measured values.
+    """
+    categories = sorted(module.fastpath._FAST_CATEGORIES)
+    best = {}
+    results = {}
+    for fast in (False, True):
+        visitor = module.CustomNodeVisitor(categories=categories, fast=fast)
+        best[fast] = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            results[fast] = [
+                visitor.analyze(source, is_path=False).node_count
+                for source in sources]
+            best[fast] = min(best[fast], time.perf_counter() - start)
+    return {
+        "files": len(sources),
+        "full_s": round(best[False], 6),
+        "fast_s": round(best[True], 6),
+        "speedup": round(best[False] / best[True], 1) if best[True] else 0,
+        "mismatches": sum(
+            full != fast for full, fast in zip(results[False], results[True])),
+    }
+
+
+def stdlib_sources(module, limit: int) -> tuple[list[str], int]:
+    """
+    Reads the standard library sources which the visitor can handle.
+
+    Parameters:
+    - module: The custom_node_visitor package.
+    - limit(int): Maximum number of files.
+
+    Returns:
+    - Tuple of the source list and the number of skipped files.
+    """
+    sources = []
+    skipped = 0
+    for path in module.iter_py_paths(sysconfig.get_path("stdlib")):
+        if len(sources) >= limit:
+            break
+        try:
+            with module.open_source(path) as source:
+                text = bytes(source).decode("utf-8")
+            module.CustomNodeVisitor.from_source(text)
+        except Exception:
+            skipped += 1
+            continue
+        sources.append(text)
+    return sources, skipped
+
+
+def main(argv: list[str] = None) -> int:
+    """
+    Runs the benchmarks and prints a table, or JSON lines
+    with --json.
+
+    Returns:
+    - Exit status, 1 if the fast path results differ from the full
+    visitor, 0 otherwise.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--size", type=int, default=2000,
+        help="size parameter of the synthetic modules")
+    parser.add_argument(
+        "--repeat", type=int, default=3,
+        help="number of timed runs, the best one is reported")
+    parser.add_argument(
+        "--stdlib-limit", type=int, default=300,
+        help="maximum number of stdlib files, 0 to skip")
+    parser.add_argument(
+        "--json", action="store_true",
+        help="print one JSON object per benchmark")
+    args = parser.parse_args(argv)
+    module = custom_node_visitor
+    cases = [
+        (name, [make(args.size)]) for name, make in SYNTHETIC.items()]
+    skipped = 0
+    if args.stdlib_limit:
+        sources, skipped = stdlib_sources(module, args.stdlib_limit)
+        cases.append(("stdlib", sources))
+    if not args.json:
+        print(f"{'case':<12}{'files':>7}{'nodes':>10}{'parse s':>10}"
+              f"{'visit s':>10}{'nodes/s':>12}{'peak KiB':>10}")
+    for name, sources in cases:
+        result = {"case": name, **measure(module, sources, args.repeat)}
+        if name == "stdlib":
+            result["skipped"] = skipped
+        if args.json:
+            print(json.dumps(result))
+        else:
+            print(f"{name:<12}{result['files']:>7}{result['nodes']:>10}"
+                  f"{result['parse_s']:>10.4f}{result['visit_s']:>10.4f}"
+                  f"{result['nodes_per_s']:>12}"
+                  f"{result['peak_bytes'] // 1024:>10}")
+    if not args.stdlib_limit:
+        return 0
+    # Cross-check of the token-level fast path on the stdlib sources.
+    result = {"case": "fast_path", **measure_fast(
+        module, sources, args.repeat)}
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"\nfast path: {result['files']} files, "
+              f"full {result['full_s']:.4f}s, fast {result['fast_s']:.4f}s "
+              f"({result['speedup']}x), {result['mismatches']} mismatches")
+    if result["mismatches"]:
+        print(f"fast path differs from the full visitor on "
+              f"{result['mismatches']} files", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+This package provides CustomNodeVisitor class inherited from NodeVisitor
+class and the tools built around it.
+
+Importing the package has no side effects and loads only the visitor
+itself; the heavier parts are imported on first access:
+- ResultCache(sqlite3) from custom_node_visitor.cache
+- Instrumentation from custom_node_visitor.instrument
+- iter_py_paths, iter_scan, merge_results and scan(concurrent.futures)
+  from custom_node_visitor.batch
+- analyze_path and aiter_scan(asyncio) from custom_node_visitor.aio
+- IncrementalAnalyzer from custom_node_visitor.incremental
+- SymbolIndex, Definition and CallSite from custom_node_visitor.index
+- TreeCache from custom_node_visitor.trees
+- SharedCounts and scan_totals(multiprocessing)
+  from custom_node_visitor.shared
+
+CustomNodeVisitor options beyond counting:
+- analyze_lines(script, start, end) visits only the top-level
+  statements overlapping a line range, e.g. the lines of a diff.
+- scopes=True builds scope_index, whose enclosing(lineno) returns
+  the function or class enclosing a line in O(log n).
+- low_memory=True parses and visits one top-level statement at a time,
+  for huge generated modules.
+
+python -m custom_node_visitor -j 4 PATH ... scans the files and
+streams one JSON Lines record per file, followed by a summary record.
+"""
+from importlib import import_module
+
+from .counters import SYMBOLS, CounterStore, SymbolTable
+from .loader import open_source
+from .records import DocRecord, NodeEvent
+from .scopes import Scope, ScopeIndex
+from .visitor import CustomNodeVisitor
+
+# Public name -> submodule, for the names loaded on first access.
+_LAZY = {
+    "ResultCache": "cache",
+    "Instrumentation": "instrument",
+    "iter_py_paths": "batch",
+    "iter_scan": "batch",
+    "merge_results": "batch",
+    "scan": "batch",
+    "analyze_path": "aio",
+    "aiter_scan": "aio",
+    "IncrementalAnalyzer": "incremental",
+    "SymbolIndex": "index",
+    "Definition": "index",
+    "CallSite": "index",
+    "TreeCache": "trees",
+    "SharedCounts": "shared",
+    "scan_totals": "shared",
+}
+
+__all__ = [
+    "CustomNodeVisitor", "NodeEvent", "DocRecord", "CounterStore",
+    "SymbolTable", "SYMBOLS", "open_source", "Scope", "ScopeIndex",
+    *_LAZY]
+
+
+def __getattr__(name: str):
+    """
+    Imports the submodule of a lazily loaded name (PEP 562).
+
+    Parameters:
+    - name(str): Attribute name.
+
+    Returns:
+    - The attribute.
+
+    Raises:
+    - AttributeError: If the name is not provided by the package.
+    """
+    try:
+        module_name = _LAZY[name]
+    except KeyError:
+        raise AttributeError(
+            f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(import_module(f".{module_name}", __name__), name)
+    # Cached, so that __getattr__ is called once per name.
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY))
@@ -0,0 +1,10 @@
+"""
+Runs the command-line scanner: python -m custom_node_visitor.
+"""
+import sys
+
+from .cli import main
+
+# The guard is required, spawned pool workers import this module.
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+This module provides analyze_path and aiter_scan coroutines
+to run CustomNodeVisitor from asyncio services.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import TYPE_CHECKING, AsyncIterator, Iterable
+
+from .batch import _scan_file, iter_py_paths
+
+if TYPE_CHECKING:
+    from .cache import ResultCache
+
+
+# Process pool used when no executor is given, created on first use.
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _default_executor() -> ProcessPoolExecutor:
+    """
+    Returns the process pool shared by the coroutines of this module.
+    A thread pool would stall the event loop, as parsing and visiting
+    hold the GIL.
+
+    Returns:
+    - ProcessPoolExecutor object with one process per CPU.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor()
+        return _executor
+
+
+async def analyze_path(
+        path: str,
+        *,
+        executor: Executor = None,
+        cache: "ResultCache" = None,
+        categories: Iterable[str] = None
+) -> dict:
+    """
+    Visits a file in the executor so that the event loop keeps running
+    while the file is read, parsed and visited.
+
+    Parameters:
+    - path(str): Path of the file to be visited.
+    - executor(Executor): Executor to run the visit, a process pool
+    shared by this module if None. A ThreadPoolExecutor stalls
+    the event loop while a file is parsed, as parsing holds the GIL.
+    - cache(ResultCache): Optional cache of results.
+    - categories: Optional node_count keys to count.
+
+    Returns:
+    - Per-file result dictionary (see _scan_file).
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor or _default_executor(), _scan_file, path, cache,
+        categories)
+
+
+async def aiter_scan(
+        *patterns: str,
+        executor: Executor = None,
+        limit: int = None,
+        cache: "ResultCache" = None,
+        categories: Iterable[str] = None
+) -> AsyncIterator[dict]:
+    """
+    Visits every python file matched by the patterns in the executor
+    and yields per-file results in completion order. At most limit
+    files are in flight. When the iteration is cancelled or closed,
+    files not started yet are cancelled, and results of running
+    ones are discarded.
+
+    Parameters:
+    - *patterns(str): Directories, file paths or glob patterns.
+    - executor(Executor): Executor to run the visits, a process pool
+    shared by this module if None (see analyze_path).
+    - limit(int): Maximum number of files in flight
+    (default: cpu count).
+    - cache(ResultCache): Optional cache of results.
+    - categories: Optional node_count keys to count.
+
+    Returns:
+    - Async iterator of per-file result dictionaries.
+
+    Raises:
+    - ValueError: limit is less than 1.
+    """
+    limit = limit or os.cpu_count() or 1
+    if limit < 1:
+        raise ValueError("limit must be positive.")
+    executor = executor or _default_executor()
+    loop = asyncio.get_running_loop()
+    paths = iter_py_paths(*patterns)
+    pending = set()
+    try:
+        while True:
+            # Walking directories blocks too, so it runs in a thread.
+            path = await loop.run_in_executor(None, next, paths, None)
+            if path is None:
+                break
+            if len(pending) >= limit:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            pending.add(loop.run_in_executor(
+                executor, _scan_file, path, cache, categories))
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
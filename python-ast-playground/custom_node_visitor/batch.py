@@ -0,0 +1,260 @@
+"""
+This module provides scan functions to run CustomNodeVisitor
+over whole directories with a process pool.
+"""
+import glob
+import os
+import threading
+from concurrent.futures import (
+    FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait)
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
+
+from .counters import CounterStore
+from .visitor import CustomNodeVisitor
+
+if TYPE_CHECKING:
+    from .cache import ResultCache
+
+
+def iter_py_paths(*patterns: str) -> Iterator[str]:
+    """
+    Lazily yields python file paths for the given patterns.
+    A directory is walked recursively for "*.py" files, a file path
+    is yielded as it is, and anything else is expanded as a glob
+    pattern ("**" is supported).
+
+    Parameters:
+    - *patterns(str): Directories, file paths or glob patterns.
+
+    Returns:
+    - Iterator of file paths.
+    """
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, dirs, files in os.walk(pattern):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.endswith(".py"):
+                        yield os.path.join(root, name)
+        elif os.path.isfile(pattern):
+            yield pattern
+        else:
+            for path in glob.iglob(pattern, recursive=True):
+                if os.path.isfile(path):
+                    yield path
+
+
+# Visitors reused by _scan_file, one per thread and configuration.
+_worker_state = threading.local()
+
+
+def _worker_visitor(
+        cache: "ResultCache" = None,
+        categories: Iterable[str] = None,
+        fast: bool = False
+) -> CustomNodeVisitor:
+    """
+    Returns the visitor of this thread for the configuration,
+    so that a worker reuses one visitor (and one cache connection)
+    across files instead of building them per file.
+
+    Parameters:
+    - cache(ResultCache): Optional cache of results.
+    - categories: Optional node_count keys to count.
+    - fast(bool): Use the fast path of CustomNodeVisitor.
+
+    Returns:
+    - CustomNodeVisitor object.
+    """
+    visitors = getattr(_worker_state, "visitors", None)
+    if visitors is None:
+        visitors = _worker_state.visitors = {}
+    key = (
+        None if cache is None else (cache.path, cache.max_bytes),
+        None if categories is None else frozenset(categories),
+        fast)
+    visitor = visitors.get(key)
+    if visitor is None:
+        visitor = visitors[key] = CustomNodeVisitor(
+            cache=cache, categories=categories, fast=fast)
+    return visitor
+
+
+def _scan_file(
+        path: str,
+        cache: "ResultCache" = None,
+        categories: Iterable[str] = None,
+        fast: bool = False
+) -> dict:
+    """
+    Worker function to visit a single file in a pool process.
+    Any error is reported in the result instead of being raised,
+    so that a broken file does not abort the whole scan.
+
+    Parameters:
+    - path(str): Path of the file to be visited.
+    - cache(ResultCache): Optional cache of results.
+    - categories: Optional node_count keys to count.
+    - fast(bool): Use the fast path of CustomNodeVisitor.
+
+    Returns:
+    - Dictionary with "path", "node_count", "sum", "doc_list"
+    and "error" keys.
+    """
+    visitor = _worker_visitor(cache, categories, fast)
+    try:
+        visitor.analyze(path, is_path=True)
+    except Exception as e:
+        return {
+            "path": path, "node_count": {}, "sum": 0,
+            "doc_list": [], "error": f"{e.__class__.__name__}: {e}"}
+    return {
+        "path": path,
+        "node_count": visitor.node_count,
+        "sum": visitor.sum,
+        "doc_list": visitor.doc_list,
+        "error": None}
+
+
+def iter_scan(
+        *patterns: str,
+        workers: int = None,
+        max_in_flight: int = None,
+        cache: "ResultCache" = None,
+        categories: Iterable[str] = None,
+        fast: bool = False
+) -> Iterator[dict]:
+    """
+    Visits every python file matched by the patterns in a process pool
+    and yields per-file results as soon as they are finished.
+    Results are yielded in completion order, not in path order.
+
+    Parameters:
+    - *patterns(str): Directories, file paths or glob patterns.
+    - workers(int): Number of worker processes (default: cpu count).
+    - max_in_flight(int): Maximum number of files submitted but not
+    yet yielded, which keeps memory flat on huge trees
+    (default: 4 times workers).
+    - cache(ResultCache): Optional cache of results shared by workers.
+    - categories: Optional node_count keys to count.
+    - fast(bool): Use the fast path of CustomNodeVisitor, which counts
+    import and definition categories without parsing.
+
+    Returns:
+    - Iterator of per-file result dictionaries (see _scan_file).
+
+    Raises:
+    - ValueError: workers or max_in_flight is less than 1.
+    """
+    return _iter_pool(
+        _scan_file, iter_py_paths(*patterns), workers, max_in_flight,
+        cache, categories, fast)
+
+
+def _iter_pool(
+        function: Callable[..., dict],
+        paths: Iterable[str],
+        workers: int = None,
+        max_in_flight: int = None,
+        *args,
+        initializer: Callable[..., None] = None,
+        initargs: tuple = ()
+) -> Iterator[dict]:
+    """
+    Calls the worker function for every path in a process pool
+    and yields the results in completion order, with at most
+    max_in_flight paths submitted but not yet yielded.
+
+    Parameters:
+    - function: Picklable worker function called as
+    function(path, *args).
+    - paths: Iterable of file paths.
+    - workers(int): Number of worker processes (default: cpu count).
+    - max_in_flight(int): Maximum number of paths in flight
+    (default: 4 times workers).
+    - *args: Extra arguments of the worker function.
+    - initializer: Optional function called as initializer(*initargs)
+    in every worker process when it starts.
+    - initargs(tuple): Arguments of the initializer.
+
+    Returns:
+    - Iterator of the worker results.
+
+    Raises:
+    - ValueError: workers or max_in_flight is less than 1.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 4
+    if workers < 1 or max_in_flight < 1:
+        raise ValueError("workers and max_in_flight must be positive.")
+    with ProcessPoolExecutor(
+            max_workers=workers, initializer=initializer,
+            initargs=initargs) as executor:
+        pending = set()
+        for path in paths:
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            pending.add(executor.submit(function, path, *args))
+        for future in as_completed(pending):
+            yield future.result()
+
+
+def merge_results(results: Iterable[dict]) -> dict:
+    """
+    Merges per-file results into one aggregate report.
+    Each doc_list entry gets a "path" key to know where it came from.
+
+    Parameters:
+    - results: Iterable of per-file result dictionaries.
+
+    Returns:
+    - Dictionary with "files", "node_count", "sum", "doc_list"
+    and "errors" keys.
+    """
+    report = {
+        "files": 0, "node_count": {}, "sum": 0,
+        "doc_list": [], "errors": []}
+    node_count = CounterStore(dense=True)
+    for result in results:
+        report["files"] += 1
+        if result["error"] is not None:
+            report["errors"].append(
+                {"path": result["path"], "error": result["error"]})
+            continue
+        node_count.update(result["node_count"])
+        report["sum"] += result["sum"]
+        report["doc_list"].extend(
+            {**doc, "path": result["path"]} for doc in result["doc_list"])
+    report["node_count"] = node_count.as_dict()
+    return report
+
+
+def scan(
+        *patterns: str,
+        workers: int = None,
+        max_in_flight: int = None,
+        cache: "ResultCache" = None,
+        categories: Iterable[str] = None,
+        fast: bool = False
+) -> dict:
+    """
+    Visits every python file matched by the patterns in a process pool
+    and returns one aggregate report.
+
+    Parameters:
+    - *patterns(str): Directories, file paths or glob patterns.
+    - workers(int): Number of worker processes (default: cpu count).
+    - max_in_flight(int): Maximum number of files in flight
+    (default: 4 times workers).
+    - cache(ResultCache): Optional cache of results shared by workers.
+    - categories: Optional node_count keys to count.
+    - fast(bool): Use the fast path of CustomNodeVisitor.
+
+    Returns:
+    - Aggregate report dictionary (see merge_results).
+    """
+    return merge_results(iter_scan(
+        *patterns, workers=workers, max_in_flight=max_in_flight,
+        cache=cache, categories=categories, fast=fast))
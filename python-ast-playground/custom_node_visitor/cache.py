@@ -0,0 +1,284 @@
+"""
+This module provides ResultCache class to persist
+the results of CustomNodeVisitor.
+"""
+import hashlib
+import json
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+# An entry used again within this time keeps its last_used.
+_TOUCH_INTERVAL_NS = 3600 * 10**9
+
+# Number of pending last_used updates written in one transaction.
+_TOUCH_BATCH = 256
+
+
+@contextmanager
+def _transaction(
+        connection: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """
+    Runs the block in a write transaction. The write lock is taken
+    up front, so that pool processes wait for each other instead of
+    failing to upgrade a read lock.
+
+    Parameters:
+    - connection: SQLite connection in autocommit mode.
+
+    Returns:
+    - Context manager giving the connection.
+    """
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        yield connection
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    connection.execute("COMMIT")
+
+
+class ResultCache:
+    """
+    On-disk cache of CustomNodeVisitor results stored in SQLite.
+    Entries are keyed by the content hash of the script and the
+    Python version, and the least recently used entries are evicted
+    when the total size of stored results exceeds max_bytes.
+    The cache can be shared by pool processes and threads, each
+    thread of each process opens its own connection, as a SQLite
+    connection may not be used by several threads at once.
+
+    Hits do not write, so that a warm scan costs about the hashing:
+    last_used is only updated when it is older than an hour, and
+    those updates are kept in memory and written in one transaction
+    by the next put, by close, or once 256 are pending. Updates
+    pending when a process exits without close are lost, which only
+    makes the entries look older to the eviction.
+
+    Attributes:
+    - path: Path of the SQLite database file.
+    - max_bytes: Size cap of the stored results in bytes.
+    - __local: threading.local holding the connection of each
+    thread, opened on first use.
+    - __connections: List of the open connections of all threads.
+    - __lock: Lock of __connections and __touched.
+    - __touched: Dictionary of key to last_used time of the hits
+    not written yet.
+    """
+
+    # Bump when the stored results of CustomNodeVisitor change.
+    FORMAT_VERSION = 2
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024) -> None:
+        """
+        Initializes the ResultCache object.
+
+        Parameters:
+        - path(str): Path of the SQLite database file.
+        - max_bytes(int): Size cap of the stored results in bytes
+        (default: 256MiB).
+
+        Raises:
+        - ValueError: max_bytes is less than 1.
+        """
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be positive.")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.__local = threading.local()
+        self.__connections = []
+        self.__lock = threading.Lock()
+        self.__touched = {}
+
+    def __getstate__(self) -> dict:
+        """
+        Returns the state to pickle, without the connections
+        so that the cache can be sent to pool processes.
+        """
+        return {"path": self.path, "max_bytes": self.max_bytes}
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Restores the pickled state.
+        """
+        self.__init__(state["path"], state["max_bytes"])
+
+    def __connect(self) -> sqlite3.Connection:
+        """
+        Opens the connection of this thread and creates the tables
+        if needed.
+
+        Returns:
+        - SQLite connection.
+        """
+        connection = getattr(self.__local, "connection", None)
+        if connection is None:
+            # Autocommit, write transactions are begun by _transaction.
+            # Only this thread uses the connection, but close may be
+            # called from another one.
+            connection = sqlite3.connect(
+                self.path, timeout=30, isolation_level=None,
+                check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            # Durable at checkpoints, not on every commit.
+            connection.execute("PRAGMA synchronous=NORMAL")
+            with _transaction(connection):
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS results ("
+                    "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                    "size INTEGER NOT NULL, last_used INTEGER NOT NULL)")
+                connection.execute(
+                    "CREATE INDEX IF NOT EXISTS results_last_used "
+                    "ON results (last_used)")
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS meta ("
+                    "name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+                connection.execute(
+                    "INSERT OR IGNORE INTO meta VALUES ('total_size', 0)")
+            self.__local.connection = connection
+            with self.__lock:
+                self.__connections.append(connection)
+        return connection
+
+    @staticmethod
+    def key(source: str | bytes) -> str:
+        """
+        Returns the cache key of the source.
+
+        Parameters:
+        - source: Content of the script, a string or bytes-like object.
+
+        Returns:
+        - Key string made of the interpreter version,
+        the cache format version and the sha256 hash of the source.
+        """
+        if isinstance(source, str):
+            source = source.encode("utf-8")
+        return "{}:{}:{}".format(
+            sys.implementation.cache_tag,
+            ResultCache.FORMAT_VERSION,
+            hashlib.sha256(source).hexdigest())
+
+    def get(self, key: str) -> dict | None:
+        """
+        Returns the stored results and marks them as recently used,
+        without writing to the database (see the class docstring).
+
+        Parameters:
+        - key(str): Key returned by the key method.
+
+        Returns:
+        - Results dictionary, or None if the key is not stored.
+        """
+        connection = self.__connect()
+        # fetchall ends the statement, so no read lock is kept.
+        rows = connection.execute(
+            "SELECT value, last_used FROM results WHERE key = ?",
+            (key,)).fetchall()
+        if not rows:
+            return None
+        value, last_used = rows[0]
+        now = time.time_ns()
+        if now - last_used >= _TOUCH_INTERVAL_NS:
+            with self.__lock:
+                self.__touched[key] = now
+                full = len(self.__touched) >= _TOUCH_BATCH
+            if full:
+                with _transaction(connection):
+                    self.__flush(connection)
+        return json.loads(value)
+
+    def __flush(self, connection: sqlite3.Connection) -> None:
+        """
+        Writes the pending last_used updates of the hits.
+
+        Parameters:
+        - connection: SQLite connection inside a transaction.
+        """
+        with self.__lock:
+            touched = self.__touched
+            self.__touched = {}
+        # Entries evicted meanwhile are not matched.
+        connection.executemany(
+            "UPDATE results SET last_used = MAX(last_used, ?) "
+            "WHERE key = ?",
+            [(last_used, key) for key, last_used in touched.items()])
+
+    def put(self, key: str, result: dict) -> None:
+        """
+        Stores the results and evicts the least recently used entries
+        if the size cap is exceeded.
+
+        Parameters:
+        - key(str): Key returned by the key method.
+        - result(dict): JSON serializable results.
+        """
+        value = json.dumps(result, separators=(",", ":")).encode("utf-8")
+        with _transaction(self.__connect()) as connection:
+            # Before eviction, which goes by last_used.
+            self.__flush(connection)
+            row = connection.execute(
+                "SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+            connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time_ns()))
+            connection.execute(
+                "UPDATE meta SET value = value + ? "
+                "WHERE name = 'total_size'",
+                (len(value) - (row[0] if row else 0),))
+            self.__evict(connection)
+
+    def __evict(self, connection: sqlite3.Connection) -> None:
+        """
+        Deletes the least recently used entries until the total size
+        is under 90% of the cap, so that eviction does not run
+        on every put once the cache is full.
+
+        Parameters:
+        - connection: SQLite connection inside a transaction.
+        """
+        total = connection.execute(
+            "SELECT value FROM meta WHERE name = 'total_size'").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * 9 // 10
+        freed = 0
+        keys = []
+        for key, size in connection.execute(
+                "SELECT key, size FROM results ORDER BY last_used"):
+            if total - freed <= target:
+                break
+            keys.append((key,))
+            freed += size
+        connection.executemany("DELETE FROM results WHERE key = ?", keys)
+        connection.execute(
+            "UPDATE meta SET value = value - ? WHERE name = 'total_size'",
+            (freed,))
+
+    def clear(self) -> None:
+        """
+        Deletes all entries.
+        """
+        with _transaction(self.__connect()) as connection:
+            connection.execute("DELETE FROM results")
+            connection.execute(
+                "UPDATE meta SET value = 0 WHERE name = 'total_size'")
+
+    def close(self) -> None:
+        """
+        Writes the pending last_used updates and closes
+        the connections of all threads, they are opened again on next
+        use. No other thread may use the cache meanwhile.
+        """
+        if self.__touched:
+            with _transaction(self.__connect()) as connection:
+                self.__flush(connection)
+        with self.__lock:
+            connections = self.__connections
+            self.__connections = []
+            self.__local = threading.local()
+        for connection in connections:
+            connection.close()
@@ -0,0 +1,125 @@
+"""
+This module provides iter_chunks function to split a source into
+its top-level statements without parsing it, for the low-memory mode
+of CustomNodeVisitor, and the functions to read the source lazily
+line by line.
+"""
+import codecs
+import tokenize
+from itertools import chain
+from typing import BinaryIO, Iterator
+
+# Keywords which continue a compound statement at the top level.
+_CLAUSES = frozenset(("else", "elif", "except", "finally"))
+
+# Tokens which do not start a logical line.
+_NON_STARTING = frozenset((
+    tokenize.NL, tokenize.COMMENT, tokenize.INDENT, tokenize.DEDENT,
+    tokenize.ENDMARKER))
+
+
+def iter_text_lines(text: str) -> Iterator[str]:
+    """
+    Lazily yields the lines of the text with their line breaks,
+    without copying the whole text like str.splitlines.
+
+    Parameters:
+    - text(str): Source string.
+
+    Returns:
+    - Iterator of lines.
+    """
+    start = 0
+    size = len(text)
+    while start < size:
+        end = text.find("\n", start) + 1 or size
+        yield text[start:end]
+        start = end
+
+
+def iter_file_lines(file: BinaryIO) -> Iterator[str]:
+    """
+    Lazily yields the decoded lines of a file opened in binary mode,
+    in the encoding given by its BOM or PEP 263 declaration.
+
+    Parameters:
+    - file(BinaryIO): File opened in binary mode.
+
+    Returns:
+    - Iterator of lines, the BOM removed.
+
+    Raises:
+    - SyntaxError: The encoding declaration is invalid.
+    """
+    encoding, first_lines = tokenize.detect_encoding(file.readline)
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for line in chain(first_lines, iter(file.readline, b"")):
+        yield decoder.decode(line)
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def iter_chunks(lines: Iterator[str]) -> Iterator[tuple[int, str]]:
+    """
+    Splits the source into the text of each top-level statement,
+    reading the lines lazily so that only the current statement is
+    held. A statement starts at a logical line without indentation,
+    unless it continues a compound statement (else, elif, except,
+    finally) or follows a decorator. Comments and blank lines go with
+    the statement before them.
+
+    A source the tokenizer can not split (e.g. an unclosed bracket)
+    is yielded as it is from the failing statement on, so that parsing
+    the chunk reports the error.
+
+    Parameters:
+    - lines: Iterator of the source lines with their line breaks.
+
+    Returns:
+    - Iterator of tuples of the first line number of the chunk
+    and its text.
+
+    Raises:
+    - IndentationError: The indentation is inconsistent.
+    """
+    # Lines read by the tokenizer but not yielded yet.
+    pending = []
+    first = 1
+
+    def readline() -> str:
+        line = next(lines, "")
+        if line:
+            pending.append(line)
+        return line
+
+    level = 0
+    line_start = True
+    decorated = False
+    started = False
+    try:
+        for token in tokenize.generate_tokens(readline):
+            kind = token.type
+            if kind == tokenize.INDENT:
+                level += 1
+            elif kind == tokenize.DEDENT:
+                level -= 1
+            elif kind == tokenize.NEWLINE:
+                line_start = True
+            elif line_start and kind not in _NON_STARTING:
+                line_start = False
+                if level:
+                    continue
+                if started and not decorated and not (
+                        kind == tokenize.NAME
+                        and token.string in _CLAUSES):
+                    row = token.start[0]
+                    yield first, "".join(pending[:row - first])
+                    del pending[:row - first]
+                    first = row
+                started = True
+                decorated = kind == tokenize.OP and token.string == "@"
+    except tokenize.TokenError:
+        pending.extend(lines)
+    if pending:
+        yield first, "".join(pending)
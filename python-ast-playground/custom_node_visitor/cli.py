@@ -0,0 +1,204 @@
+"""
+This module provides the command-line scanner of CustomNodeVisitor.
+
+It visits every python file matched by the given paths and globs,
+and streams one JSON Lines record per file as soon as it is finished,
+followed by one summary record:
+    {"type": "file", "path": ..., "node_count": ..., "sum": ...,
+     "doc_list": ..., "error": ...}
+    {"type": "summary", "files": ..., "errors": ..., "node_count": ...,
+     "sum": ..., "elapsed_s": ...}
+
+Only the running totals are kept, so memory stays flat
+however many files are scanned. A PATH which is neither a file,
+a directory nor a glob pattern matching anything gets a file record
+with an error, and the exit status is then 1.
+
+Usage:
+    python -m custom_node_visitor [-j N] [--categories LIST]
+                                  [--cache PATH] [--fast] [--no-docs]
+                                  PATH [PATH ...]
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from typing import Iterator, TextIO
+
+from .batch import _scan_file, iter_py_paths, iter_scan
+from .counters import CounterStore
+
+
+def _is_missing(pattern: str) -> bool:
+    """
+    Tells whether a PATH argument matches nothing.
+
+    Parameters:
+    - pattern(str): Directory, file path or glob pattern.
+
+    Returns:
+    - True if the pattern is neither an existing path nor a glob
+    pattern matching a path, False otherwise.
+    """
+    return (
+        not os.path.exists(pattern)
+        and next(glob.iglob(pattern, recursive=True), None) is None)
+
+
+def _iter_results(args: argparse.Namespace) -> Iterator[dict]:
+    """
+    Yields per-file results, in this process for a single job
+    and in a process pool otherwise.
+
+    Parameters:
+    - args(Namespace): Parsed command-line arguments.
+
+    Returns:
+    - Iterator of per-file result dictionaries.
+    """
+    patterns = []
+    for pattern in args.paths:
+        if _is_missing(pattern):
+            yield {
+                "path": pattern, "node_count": {}, "sum": 0,
+                "doc_list": [],
+                "error": "FileNotFoundError: No such file, directory "
+                         "or matching glob pattern"}
+        else:
+            patterns.append(pattern)
+    if not patterns:
+        return
+    cache = None
+    if args.cache is not None:
+        from .cache import ResultCache
+        cache = ResultCache(args.cache)
+    if args.jobs == 1:
+        # A pool only adds start-up and pickling cost for one job.
+        for path in iter_py_paths(*patterns):
+            yield _scan_file(path, cache, args.categories, args.fast)
+    else:
+        yield from iter_scan(
+            *patterns, workers=args.jobs, cache=cache,
+            categories=args.categories, fast=args.fast)
+    if cache is not None:
+        cache.close()
+
+
+def _write(record: dict, output: TextIO) -> None:
+    """
+    Writes one JSON Lines record and flushes it,
+    so that readers see every file as soon as it is finished.
+
+    Parameters:
+    - record(dict): Record to write.
+    - output(TextIO): Stream to write to.
+    """
+    output.write(json.dumps(record, ensure_ascii=False) + "\n")
+    output.flush()
+
+
+def run(args: argparse.Namespace, output: TextIO) -> int:
+    """
+    Scans the files and writes the records.
+
+    Parameters:
+    - args(Namespace): Parsed command-line arguments.
+    - output(TextIO): Stream to write the records to.
+
+    Returns:
+    - Exit status, 1 if any file failed or any PATH matched nothing,
+    and 0 otherwise.
+    """
+    start = time.perf_counter()
+    node_count = CounterStore(dense=True)
+    files = errors = total = 0
+    for result in _iter_results(args):
+        files += 1
+        if result["error"] is None:
+            node_count.update(result["node_count"])
+            total += result["sum"]
+        else:
+            errors += 1
+        if args.no_docs:
+            del result["doc_list"]
+        _write({"type": "file", **result}, output)
+    _write({
+        "type": "summary",
+        "files": files,
+        "errors": errors,
+        "node_count": node_count.as_dict(),
+        "sum": total,
+        "elapsed_s": round(time.perf_counter() - start, 6),
+    }, output)
+    return 1 if errors else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Builds the argument parser of the scanner.
+
+    Returns:
+    - ArgumentParser object.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m custom_node_visitor",
+        description="Count AST nodes of python files and stream "
+                    "the results as JSON Lines.")
+    parser.add_argument(
+        "paths", nargs="+", metavar="PATH",
+        help="directories, python files or glob patterns "
+             "('**' is supported)")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=os.cpu_count() or 1,
+        help="number of worker processes (default: cpu count)")
+    parser.add_argument(
+        "--categories", type=lambda value: value.split(","),
+        help="comma separated node_count keys to count, "
+             "e.g. 'for,while,print'")
+    parser.add_argument(
+        "--cache", metavar="PATH",
+        help="SQLite file to cache results across runs")
+    parser.add_argument(
+        "--fast", action="store_true",
+        help="count import and definition categories from tokens "
+             "without parsing, requires --categories with only "
+             "those categories")
+    parser.add_argument(
+        "--no-docs", action="store_true",
+        help="leave doc_list out of the file records")
+    return parser
+
+
+def main(argv: list[str] = None) -> int:
+    """
+    Entry point of the scanner.
+
+    Parameters:
+    - argv(list): Command-line arguments (default: sys.argv[1:]).
+
+    Returns:
+    - Exit status.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("-j/--jobs must be positive.")
+    if args.fast:
+        # Otherwise every file would be parsed without notice.
+        from .fastpath import _FAST_CATEGORIES
+        if args.categories is None:
+            parser.error("--fast requires --categories.")
+        if not set(args.categories) <= _FAST_CATEGORIES:
+            parser.error(
+                "--fast only supports the categories "
+                + ",".join(sorted(_FAST_CATEGORIES)) + ".")
+    try:
+        return run(args, sys.stdout)
+    except BrokenPipeError:
+        # The reader (e.g. head) has gone, which is not an error.
+        # stdout is redirected, so that the exit flush does not fail.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
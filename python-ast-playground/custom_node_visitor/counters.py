@@ -0,0 +1,372 @@
+"""
+This module provides SymbolTable and CounterStore classes
+to store the node counts of CustomNodeVisitor.
+"""
+import operator
+import threading
+from array import array
+from itertools import repeat
+from typing import Iterable
+
+from .nodes import _CATEGORY_NODES
+
+
+class SymbolTable:
+    """
+    Interns node_count keys into integer slots. The fixed category
+    keys take the first slots, called names are added on first use.
+    One table (SYMBOLS) is shared by all CounterStore objects of
+    a process, so that their slots line up.
+    Interning is thread-safe, lookups of interned keys take no lock.
+
+    Attributes:
+    - __slots: Dictionary of key to slot.
+    - __keys: List of keys indexed by slot.
+    - __lock: Lock for adding keys.
+    """
+
+    def __init__(self, keys: Iterable[str] = ()) -> None:
+        """
+        Initializes the SymbolTable object.
+
+        Parameters:
+        - keys: Keys to intern first.
+        """
+        self.__slots = {}
+        self.__keys = []
+        self.__lock = threading.Lock()
+        for key in keys:
+            self.intern(key)
+
+    def __len__(self) -> int:
+        return len(self.__keys)
+
+    def intern(self, key: str) -> int:
+        """
+        Returns the slot of the key, adding it if needed.
+
+        Parameters:
+        - key(str): node_count key.
+
+        Returns:
+        - Slot index.
+        """
+        try:
+            return self.__slots[key]
+        except KeyError:
+            pass
+        with self.__lock:
+            # Another thread may have added it meanwhile.
+            slot = self.__slots.get(key)
+            if slot is None:
+                # The key is listed before its slot is published.
+                self.__keys.append(key)
+                slot = self.__slots[key] = len(self.__keys) - 1
+            return slot
+
+    def find(self, key: str) -> int | None:
+        """
+        Returns the slot of the key without adding it.
+
+        Parameters:
+        - key(str): node_count key.
+
+        Returns:
+        - Slot index, or None if the key is not interned.
+        """
+        return self.__slots.get(key)
+
+    def key(self, slot: int) -> str:
+        """
+        Returns the key of the slot.
+
+        Parameters:
+        - slot(int): Slot index.
+
+        Returns:
+        - node_count key.
+        """
+        return self.__keys[slot]
+
+
+SYMBOLS = SymbolTable(_CATEGORY_NODES)
+
+
+class CounterStore:
+    """
+    Compact node_count storage. Counts are indexed by the slots of
+    a SymbolTable, so that stores sharing the table are merged slot
+    by slot without hashing the keys. A store is sparse by default,
+    a dictionary of slot to count which only holds the counted slots,
+    however many keys the table has. A dense store keeps an array
+    of 64-bit integers indexed by slot, as long as the highest slot
+    it counted, and merging another dense store adds their arrays
+    element-wise, which suits aggregates over many files.
+    The order in which keys were first counted is kept, so as_dict
+    gives the same dictionary as the former plain dict counting.
+
+    Attributes:
+    - __symbols: SymbolTable of the slots.
+    - __dense: True if the counts are kept in an array.
+    - __counts: Dictionary of slot to count in first-counted order
+    if sparse, array of counts indexed by slot if dense.
+    - __order: List of counted slots in first-counted order if dense,
+    None if sparse.
+    """
+
+    __slots__ = ("__symbols", "__dense", "__counts", "__order")
+
+    def __init__(
+            self, symbols: SymbolTable = None, dense: bool = False) -> None:
+        """
+        Initializes the CounterStore object.
+
+        Parameters:
+        - symbols(SymbolTable): Table of slots (default: SYMBOLS).
+        - dense(bool): Keep the counts in an array indexed by slot,
+        for aggregates (default: False).
+        """
+        self.__symbols = SYMBOLS if symbols is None else symbols
+        self.__dense = dense
+        if dense:
+            self.__counts = array('q')
+            self.__order = []
+        else:
+            self.__counts = {}
+            self.__order = None
+
+    @classmethod
+    def from_dict(
+            cls, mapping: dict[str: int],
+            symbols: SymbolTable = None,
+            dense: bool = False) -> "CounterStore":
+        """
+        Creates a store from a node_count dictionary.
+
+        Parameters:
+        - mapping(dict): node_count dictionary.
+        - symbols(SymbolTable): Table of slots (default: SYMBOLS).
+        - dense(bool): Keep the counts in an array (default: False).
+
+        Returns:
+        - CounterStore object.
+        """
+        store = cls(symbols, dense)
+        store.update(mapping)
+        return store
+
+    def __reduce__(self) -> tuple:
+        # Slots are only valid in this process, pickle the keys.
+        return (CounterStore.from_dict, (self.as_dict(), None, self.__dense))
+
+    def __len__(self) -> int:
+        if self.__dense:
+            return len(self.__order)
+        return len(self.__counts)
+
+    def __items(self) -> Iterable[tuple[int, int]]:
+        """
+        Returns the counted slots and their counts.
+
+        Returns:
+        - Iterable of (slot, count) in first-counted order.
+        """
+        if not self.__dense:
+            return self.__counts.items()
+        counts = self.__counts
+        return ((slot, counts[slot]) for slot in self.__order)
+
+    def __grow(self, size: int) -> None:
+        """
+        Extends the array of a dense store with zeros up to the size.
+
+        Parameters:
+        - size(int): Required length.
+        """
+        counts = self.__counts
+        if len(counts) < size:
+            counts.extend(repeat(0, size - len(counts)))
+
+    def add(self, slot: int, count: int = 1) -> None:
+        """
+        Adds to the count of the slot.
+
+        Parameters:
+        - slot(int): Slot index.
+        - count(int): Count to add (default: 1).
+        """
+        if not count:
+            # A slot is only counted while its count is not zero.
+            return
+        counts = self.__counts
+        if not self.__dense:
+            total = counts.get(slot, 0) + count
+            if total:
+                counts[slot] = total
+            else:
+                del counts[slot]
+            return
+        if slot >= len(counts):
+            self.__grow(slot + 1)
+        if not counts[slot]:
+            self.__order.append(slot)
+        counts[slot] += count
+
+    def increment(self, key: str) -> None:
+        """
+        Adds one to the count of the key.
+
+        Parameters:
+        - key(str): node_count key.
+        """
+        slot = self.__symbols.intern(key)
+        if self.__dense:
+            self.add(slot)
+            return
+        # The hot path of visiting, inlined from add.
+        counts = self.__counts
+        total = counts.get(slot, 0) + 1
+        if total:
+            counts[slot] = total
+        else:
+            del counts[slot]
+
+    def get(self, key: str, default: int = 0) -> int:
+        """
+        Returns the count of the key.
+
+        Parameters:
+        - key(str): node_count key.
+        - default(int): Value if the key is not counted.
+
+        Returns:
+        - The count.
+        """
+        slot = self.__symbols.find(key)
+        if slot is None:
+            return default
+        if not self.__dense:
+            return self.__counts.get(slot, default)
+        if slot >= len(self.__counts):
+            return default
+        return self.__counts[slot] or default
+
+    def update(self, mapping: dict[str: int]) -> None:
+        """
+        Adds the counts of a node_count dictionary.
+
+        Parameters:
+        - mapping(dict): node_count dictionary.
+        """
+        intern = self.__symbols.intern
+        for key, count in mapping.items():
+            self.add(intern(key), count)
+
+    def subtract(self, mapping: dict[str: int]) -> None:
+        """
+        Subtracts the counts of a node_count dictionary,
+        which must have been added before.
+
+        Parameters:
+        - mapping(dict): node_count dictionary.
+        """
+        intern = self.__symbols.intern
+        if not self.__dense:
+            for key, count in mapping.items():
+                self.add(intern(key), -count)
+            return
+        counts = self.__counts
+        for key, count in mapping.items():
+            counts[intern(key)] -= count
+        self.__order = [slot for slot in self.__order if counts[slot]]
+
+    def merge(self, other: "CounterStore") -> None:
+        """
+        Adds the counts of another store. Stores sharing the symbol
+        table are merged by slot, element-wise over the arrays when
+        both are dense and the other one is mostly filled, others
+        through as_dict.
+
+        Parameters:
+        - other(CounterStore): Store to add.
+        """
+        if other.__symbols is not self.__symbols:
+            self.update(other.as_dict())
+            return
+        other_counts = other.__counts
+        size = len(other_counts)
+        if (not self.__dense or not other.__dense
+                or len(other.__order) * 4 < size):
+            # Sparse, e.g. one file against a project-wide table.
+            add = self.add
+            for slot, count in list(other.__items()):
+                add(slot, count)
+            return
+        self.__grow(size)
+        counts = self.__counts
+        self.__order.extend(
+            slot for slot in other.__order if not counts[slot])
+        # map stops at the shorter array, which is other_counts.
+        counts[:size] = array('q', map(operator.add, counts, other_counts))
+
+    def clear(self) -> None:
+        """
+        Zeroes the counts, keeping the array of a dense store
+        for reuse.
+        """
+        counts = self.__counts
+        if not self.__dense:
+            counts.clear()
+            return
+        for slot in self.__order:
+            counts[slot] = 0
+        self.__order.clear()
+
+    def retain(self, keys: Iterable[str]) -> None:
+        """
+        Zeroes the counts of every key not in keys.
+
+        Parameters:
+        - keys: node_count keys to keep.
+        """
+        keys = set(keys)
+        key = self.__symbols.key
+        counts = self.__counts
+        if not self.__dense:
+            for slot in [slot for slot in counts if key(slot) not in keys]:
+                del counts[slot]
+            return
+        order = []
+        for slot in self.__order:
+            if key(slot) in keys:
+                order.append(slot)
+            else:
+                counts[slot] = 0
+        self.__order = order
+
+    def as_dict(self) -> dict[str: int]:
+        """
+        Returns the counts as a node_count dictionary.
+
+        Returns:
+        - Dictionary of key to count in first-counted order.
+        """
+        key = self.__symbols.key
+        return {key(slot): count for slot, count in self.__items()}
+
+    def subset(self, *keys: str) -> dict[str: int]:
+        """
+        Returns the counts of the given keys which are counted.
+
+        Parameters:
+        - *keys(str): node_count keys.
+
+        Returns:
+        - Dictionary of key to count.
+        """
+        subset = {}
+        for key in keys:
+            count = self.get(key)
+            if count:
+                subset[key] = count
+        return subset
@@ -0,0 +1,109 @@
+"""
+This module provides count_statements function, the token-level
+fast path of CustomNodeVisitor for the import and definition counts.
+"""
+import re
+
+from .counters import CounterStore
+
+# Categories count_statements can produce.
+_FAST_CATEGORIES = frozenset(
+    ("import", "function_def", "async_function_def", "class_def"))
+
+# Only the tokens which matter are matched: strings and comments to skip
+# their contents, brackets to know the nesting depth, and the keywords.
+# Each match costs far more than the characters the engine skips, so
+# brackets holding no other token are matched as one group, and the
+# leading lookahead rejects most positions with one character test.
+# String prefixes are skipped like any other letter, and a lone quote
+# is an unterminated string.
+_PATTERN = r"""(?=[()\[\]{}\#'"adci])(?:
+    (?P<string>
+        '''[^'\\]*(?:(?:\\.|'(?!''))[^'\\]*)*'''
+        |\"\"\"[^"\\]*(?:(?:\\.|"(?!""))[^"\\]*)*\"\"\"
+        |'[^'\\\n]*(?:\\.[^'\\\n]*)*'
+        |"[^"\\\n]*(?:\\.[^"\\\n]*)*")
+    |(?P<comment>\#[^\n]*)
+    |(?P<group>
+        \([^()\[\]{}'"\#]*\)
+        |\[[^()\[\]{}'"\#]*\]
+        |\{[^()\[\]{}'"\#]*\})
+    |(?P<open>[(\[{])
+    |(?P<close>[)\]}])
+    |\b(?:
+        (?P<async_function_def>async[ \t\f]+def)
+        |(?P<function_def>def)
+        |(?P<class_def>class)
+        |(?P<import>import))\b
+    |(?P<error>['"]))
+"""
+_STR_TOKENS = re.compile(_PATTERN, re.VERBOSE | re.DOTALL)
+_BYTES_TOKENS = re.compile(
+    _PATTERN.encode("ascii"), re.VERBOSE | re.DOTALL)
+
+
+def count_statements(source: str | bytes) -> CounterStore | None:
+    """
+    Counts import statements ("from x import y" is not one, like
+    ast.Import), function, async function and class definitions
+    without parsing. A keyword outside of brackets is counted when
+    it starts a statement: only blanks before it on its line, which
+    does not continue the previous one with a backslash, or ":" or ";"
+    right before it.
+
+    The source is not validated. A source with an unterminated string
+    or unbalanced brackets returns None, so that the caller parses
+    it and reports the error.
+
+    Parameters:
+    - source: Source string, or bytes-like object of a file
+    in an ASCII compatible encoding.
+
+    Returns:
+    - CounterStore of the counts, or None if the source could not
+    be scanned.
+    """
+    if isinstance(source, str):
+        tokens = _STR_TOKENS
+        newline, carriage_return, backslash = "\n", "\r", "\\"
+        separators = (":", ";")
+    else:
+        tokens = _BYTES_TOKENS
+        newline, carriage_return, backslash = b"\n", b"\r", b"\\"
+        separators = (b":", b";")
+    counts = CounterStore()
+    depth = 0
+    comment_end = -1
+    for match in tokens.finditer(source):
+        kind = match.lastgroup
+        if kind == "string" or kind == "group":
+            continue
+        if kind == "open":
+            depth += 1
+        elif kind == "close":
+            depth -= 1
+            if depth < 0:
+                return None
+        elif kind == "comment":
+            comment_end = match.end()
+        elif kind == "error":
+            return None
+        elif not depth:
+            position = match.start()
+            line = source.rfind(newline, 0, position) + 1
+            prefix = source[line:position].rstrip()
+            if prefix:
+                if prefix[-1:] not in separators:
+                    continue
+            elif line > 1:
+                # End of the previous line, without its line break.
+                end = line - 1
+                if source[end - 1:end] == carriage_return:
+                    end -= 1
+                # A backslash in a comment does not continue the line.
+                if source[end - 1:end] == backslash and comment_end < end:
+                    continue
+            counts.increment(kind)
+    if depth:
+        return None
+    return counts
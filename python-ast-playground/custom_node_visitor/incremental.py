@@ -0,0 +1,271 @@
+"""
+This module provides IncrementalAnalyzer class to keep
+project-wide results of CustomNodeVisitor up to date
+by re-visiting changed files only.
+"""
+import json
+import os
+from typing import TYPE_CHECKING
+
+from .counters import CounterStore
+from .batch import _scan_file, iter_py_paths, iter_scan
+
+if TYPE_CHECKING:
+    from .cache import ResultCache
+
+
+class IncrementalAnalyzer:
+    """
+    Keeps project-wide results of CustomNodeVisitor up to date.
+    A manifest of (mtime, size) per path tells which files changed,
+    and only those are visited again. Their old contributions are
+    subtracted from the running totals and the new ones are added,
+    so an update costs time proportional to the edit.
+    Files are keyed by their absolute path, so that the same file
+    given as "pkg/a.py", "./pkg/a.py" or an absolute path is counted
+    once.
+
+    Attributes:
+    - patterns: Directories, file paths or glob patterns to track.
+    - manifest_path: Optional JSON file to save and load the state.
+    - cache: Optional ResultCache used when visiting files.
+    - __manifest: Dictionary of path to [mtime_ns, size].
+    - __contributions: Dictionary of path to per-file results.
+    - __errors: Dictionary of path to error message.
+    - __node_count: CounterStore of the running total of node counts.
+    - __sum: Running total of visited nodes.
+    """
+
+    def __init__(
+            self,
+            *patterns: str,
+            manifest_path: str = None,
+            cache: "ResultCache" = None
+    ) -> None:
+        """
+        Initializes the IncrementalAnalyzer object and loads the state
+        from manifest_path if the file exists. Call refresh to
+        (re)build the results.
+
+        Parameters:
+        - *patterns(str): Directories, file paths or glob patterns.
+        - manifest_path(str): Optional JSON file to save and load
+        the state.
+        - cache(ResultCache): Optional cache of results.
+        """
+        self.patterns = patterns
+        self.manifest_path = manifest_path
+        self.cache = cache
+        self.__manifest = {}
+        self.__contributions = {}
+        self.__errors = {}
+        self.__node_count = CounterStore(dense=True)
+        self.__sum = 0
+        if manifest_path is not None and os.path.exists(manifest_path):
+            self.__load()
+
+    @property
+    def node_count(self) -> dict[str: int]:
+        """
+        Property method to get the project-wide node counts.
+
+        Returns:
+        - Dictionary of the running total of node counts.
+        """
+        return self.__node_count.as_dict()
+
+    @property
+    def sum(self) -> int:
+        """
+        Property method to get the project-wide count of visited nodes.
+
+        Returns:
+        - The running total of visited nodes.
+        """
+        return self.__sum
+
+    @property
+    def doc_list(self) -> list[dict]:
+        """
+        Property method to get the project-wide doc list.
+        Each entry has a "path" key like merge_results.
+
+        Returns:
+        - List of doc dictionaries.
+        """
+        return [
+            {**doc, "path": path}
+            for path, result in self.__contributions.items()
+            for doc in result["doc_list"]]
+
+    @property
+    def errors(self) -> dict[str: str]:
+        """
+        Property method to get the files which could not be visited.
+
+        Returns:
+        - Dictionary of path to error message.
+        """
+        return dict(self.__errors)
+
+    def refresh(self, workers: int = None) -> list[str]:
+        """
+        Stats every tracked file and re-visits new and changed ones.
+        Deleted files are removed from the totals.
+
+        Parameters:
+        - workers(int): Visit changed files with a process pool of
+        this size, they are visited in this process if None.
+
+        Returns:
+        - List of absolute paths whose contributions changed.
+        """
+        seen = set()
+        changed = []
+        for path in iter_py_paths(*self.patterns):
+            path = os.path.abspath(path)
+            seen.add(path)
+            if self.__is_changed(path):
+                changed.append(path)
+        deleted = [path for path in self.__manifest if path not in seen]
+        for path in deleted:
+            self.__remove(path)
+        self.__visit(changed, workers)
+        return deleted + changed
+
+    def update(self, *paths: str) -> list[str]:
+        """
+        Re-checks only the given paths, e.g. the file saved in an editor.
+        A path which no longer exists is removed from the totals.
+
+        Parameters:
+        - *paths(str): Paths to re-check.
+
+        Returns:
+        - List of absolute paths whose contributions changed.
+        """
+        changed = []
+        deleted = []
+        for path in map(os.path.abspath, paths):
+            if not os.path.isfile(path):
+                if path in self.__manifest:
+                    self.__remove(path)
+                    deleted.append(path)
+            elif self.__is_changed(path):
+                changed.append(path)
+        self.__visit(changed, None)
+        return deleted + changed
+
+    def save(self) -> None:
+        """
+        Saves the manifest and the per-file results to manifest_path.
+
+        Raises:
+        - ValueError: manifest_path is not set.
+        """
+        if self.manifest_path is None:
+            raise ValueError("manifest_path is not set.")
+        state = {
+            "manifest": self.__manifest,
+            "contributions": self.__contributions,
+            "errors": self.__errors}
+        temp_path = self.manifest_path + ".tmp"
+        with open(temp_path, 'w', encoding="utf-8") as file:
+            json.dump(state, file, separators=(",", ":"))
+        os.replace(temp_path, self.manifest_path)
+
+    def __load(self) -> None:
+        """
+        Loads the state saved by save and rebuilds the totals.
+        """
+        with open(self.manifest_path, 'r', encoding="utf-8") as file:
+            state = json.load(file)
+        # Manifests saved before paths were made absolute are
+        # relative to the working directory.
+        self.__manifest = {
+            os.path.abspath(path): entry
+            for path, entry in state["manifest"].items()}
+        self.__errors = {
+            os.path.abspath(path): error
+            for path, error in state["errors"].items()}
+        for path, result in state["contributions"].items():
+            self.__add(os.path.abspath(path), result)
+
+    def __is_changed(self, path: str) -> bool:
+        """
+        Compares the stat of the path with the manifest,
+        and records the new stat if it changed.
+
+        Parameters:
+        - path(str): Path of the file.
+
+        Returns:
+        - True if the file is new or changed, False otherwise.
+        """
+        stat = os.stat(path)
+        entry = [stat.st_mtime_ns, stat.st_size]
+        if self.__manifest.get(path) == entry:
+            return False
+        self.__manifest[path] = entry
+        return True
+
+    def __visit(self, paths: list[str], workers: int) -> None:
+        """
+        Visits the paths and replaces their contributions.
+
+        Parameters:
+        - paths: Absolute paths to visit.
+        - workers(int): Process pool size, or None to visit in process.
+        """
+        if workers is not None and len(paths) > 1:
+            results = iter_scan(*paths, workers=workers, cache=self.cache)
+        else:
+            results = (_scan_file(path, self.cache) for path in paths)
+        for result in results:
+            path = os.path.abspath(result["path"])
+            self.__subtract(path)
+            self.__errors.pop(path, None)
+            if result["error"] is not None:
+                self.__errors[path] = result["error"]
+                continue
+            self.__add(path, {
+                "node_count": result["node_count"],
+                "sum": result["sum"],
+                "doc_list": result["doc_list"]})
+
+    def __remove(self, path: str) -> None:
+        """
+        Forgets the path and subtracts its contribution.
+
+        Parameters:
+        - path(str): Path of the deleted file.
+        """
+        self.__subtract(path)
+        self.__manifest.pop(path, None)
+        self.__errors.pop(path, None)
+
+    def __add(self, path: str, result: dict) -> None:
+        """
+        Adds the per-file results to the running totals.
+
+        Parameters:
+        - path(str): Path of the file.
+        - result(dict): Per-file results.
+        """
+        self.__contributions[path] = result
+        self.__node_count.update(result["node_count"])
+        self.__sum += result["sum"]
+
+    def __subtract(self, path: str) -> None:
+        """
+        Subtracts the per-file results of the path from
+        the running totals, if any.
+
+        Parameters:
+        - path(str): Path of the file.
+        """
+        result = self.__contributions.pop(path, None)
+        if result is None:
+            return
+        self.__node_count.subtract(result["node_count"])
+        self.__sum -= result["sum"]
@@ -0,0 +1,419 @@
+"""
+This module provides SymbolIndex class, a persistent cross-file index
+of function and class definitions and call sites.
+"""
+import ast
+import os
+import sqlite3
+from typing import Iterable, Iterator, NamedTuple
+
+from .batch import _iter_pool, iter_py_paths
+from .cache import _transaction
+from .loader import open_source
+from .nodes import _DEFINITION_KINDS
+
+
+class Definition(NamedTuple):
+    """
+    A function or class definition found by SymbolIndex.
+
+    Attributes:
+    - path: Path of the file.
+    - qualname: Qualified name like __qualname__, e.g. "C.method"
+    or "outer.<locals>.inner".
+    - kind: "function_def", "async_function_def" or "class_def".
+    - lineno: Line of the def or class keyword.
+    - end_lineno: Last line of the definition.
+    """
+    path: str
+    qualname: str
+    kind: str
+    lineno: int
+    end_lineno: int
+
+
+class CallSite(NamedTuple):
+    """
+    A call found by SymbolIndex.
+
+    Attributes:
+    - path: Path of the file.
+    - caller: Qualified name of the enclosing definition,
+    or "<module>" at the top level.
+    - name: Called function or method name, as counted by visit_Call.
+    - lineno: Line of the call.
+    - col_offset: Column of the call.
+    """
+    path: str
+    caller: str
+    name: str
+    lineno: int
+    col_offset: int
+
+
+def _collect_symbols(tree: ast.AST) -> tuple[list[tuple], list[tuple]]:
+    """
+    Collects the definitions and call sites of the tree.
+    Only the body of a definition runs in its scope. Its decorators,
+    arguments, annotations and bases belong to the enclosing scope,
+    as they do at run time.
+
+    Parameters:
+    - tree: AST of a module.
+
+    Returns:
+    - Tuple of the definition rows
+    (qualname, name, kind, lineno, end_lineno) and the call rows
+    (name, caller, lineno, col_offset).
+    """
+    definitions = []
+    calls = []
+    # Items are (node, qualname of the enclosing definition,
+    # whether the enclosing definition is a function).
+    stack = [(tree, "", False)]
+    while stack:
+        node, scope, in_function = stack.pop()
+        kind = _DEFINITION_KINDS.get(node.__class__)
+        if kind is None:
+            if isinstance(node, ast.Call):
+                # Same names as visit_Call counts.
+                if isinstance(node.func, ast.Attribute):
+                    name = node.func.attr
+                elif isinstance(node.func, ast.Name):
+                    name = node.func.id
+                else:
+                    name = None
+                if name is not None:
+                    calls.append((
+                        name, scope or "<module>",
+                        node.lineno, node.col_offset))
+            for child in ast.iter_child_nodes(node):
+                stack.append((child, scope, in_function))
+            continue
+        if not scope:
+            qualname = node.name
+        elif in_function:
+            qualname = f"{scope}.<locals>.{node.name}"
+        else:
+            qualname = f"{scope}.{node.name}"
+        definitions.append(
+            (qualname, node.name, kind, node.lineno, node.end_lineno))
+        is_function = kind != "class_def"
+        for field, value in ast.iter_fields(node):
+            if field == "body":
+                for child in value:
+                    stack.append((child, qualname, is_function))
+            elif isinstance(value, list):
+                for child in value:
+                    if isinstance(child, ast.AST):
+                        stack.append((child, scope, in_function))
+            elif isinstance(value, ast.AST):
+                stack.append((value, scope, in_function))
+    return definitions, calls
+
+
+def _index_file(path: str) -> dict:
+    """
+    Worker function to collect the symbols of a single file.
+    Any error is reported in the result instead of being raised,
+    like _scan_file.
+
+    Parameters:
+    - path(str): Path of the file.
+
+    Returns:
+    - Dictionary with "path", "definitions", "calls" and "error" keys.
+    """
+    try:
+        with open_source(path) as source:
+            tree = ast.parse(source, path)
+    except Exception as e:
+        return {
+            "path": path, "definitions": [], "calls": [],
+            "error": f"{e.__class__.__name__}: {e}"}
+    definitions, calls = _collect_symbols(tree)
+    return {
+        "path": path, "definitions": definitions, "calls": calls,
+        "error": None}
+
+
+def _with_file_id(file_id: int, rows: list[tuple]) -> Iterator[tuple]:
+    """
+    Prepends the file id to every row.
+
+    Parameters:
+    - file_id(int): Id of the file in the files table.
+    - rows: Rows collected by _collect_symbols.
+
+    Returns:
+    - Iterator of the rows to insert.
+    """
+    return ((file_id, *row) for row in rows)
+
+
+class SymbolIndex:
+    """
+    Persistent index of the definitions and call sites of the tracked
+    files, stored in SQLite. Like IncrementalAnalyzer, the (mtime, size)
+    of every file is kept, and refresh parses new and changed files
+    only. Queries are answered from the database without parsing.
+    Files are stored by their absolute path, so that the same file
+    given as a relative or an absolute path is indexed once.
+
+    Attributes:
+    - patterns: Directories, file paths or glob patterns to track.
+    - path: Path of the SQLite database file.
+    - __connection: SQLite connection, opened on first use.
+    """
+
+    # Bump when the schema or the collected rows change,
+    # the index is rebuilt on the next refresh.
+    FORMAT_VERSION = 2
+
+    def __init__(self, *patterns: str, index_path: str) -> None:
+        """
+        Initializes the SymbolIndex object. Call refresh to
+        (re)build the index, the patterns are not needed to query it.
+
+        Parameters:
+        - *patterns(str): Directories, file paths or glob patterns.
+        - index_path(str): Path of the SQLite database file.
+        """
+        self.patterns = patterns
+        self.path = index_path
+        self.__connection = None
+
+    def __connect(self) -> sqlite3.Connection:
+        """
+        Opens the connection and creates the tables if needed.
+        Tables of another FORMAT_VERSION are dropped.
+
+        Returns:
+        - SQLite connection.
+        """
+        if self.__connection is not None:
+            return self.__connection
+        connection = sqlite3.connect(
+            self.path, timeout=30, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        with _transaction(connection):
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version != self.FORMAT_VERSION:
+                for table in ("files", "definitions", "calls"):
+                    connection.execute(f"DROP TABLE IF EXISTS {table}")
+                connection.execute(
+                    f"PRAGMA user_version = {self.FORMAT_VERSION}")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                "id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, "
+                "mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, "
+                "error TEXT)")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS definitions ("
+                "file_id INTEGER NOT NULL, qualname TEXT NOT NULL, "
+                "name TEXT NOT NULL, kind TEXT NOT NULL, "
+                "lineno INTEGER NOT NULL, end_lineno INTEGER NOT NULL)")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS calls ("
+                "file_id INTEGER NOT NULL, name TEXT NOT NULL, "
+                "caller TEXT NOT NULL, lineno INTEGER NOT NULL, "
+                "col_offset INTEGER NOT NULL)")
+            for table, column in (
+                    ("definitions", "file_id"), ("definitions", "name"),
+                    ("definitions", "qualname"), ("calls", "file_id"),
+                    ("calls", "name")):
+                connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS {table}_{column} "
+                    f"ON {table} ({column})")
+        self.__connection = connection
+        return connection
+
+    @property
+    def errors(self) -> dict[str: str]:
+        """
+        Property method to get the files which could not be parsed.
+
+        Returns:
+        - Dictionary of path to error message.
+        """
+        return dict(self.__connect().execute(
+            "SELECT path, error FROM files WHERE error IS NOT NULL"))
+
+    def refresh(self, workers: int = None) -> list[str]:
+        """
+        Stats every tracked file and re-indexes new and changed ones.
+        Deleted files are removed from the index.
+
+        Parameters:
+        - workers(int): Parse changed files with a process pool of
+        this size, they are parsed in this process if None.
+
+        Returns:
+        - List of absolute paths whose entries changed.
+
+        Raises:
+        - ValueError: No patterns are tracked.
+        """
+        if not self.patterns:
+            raise ValueError("patterns are required to refresh.")
+        connection = self.__connect()
+        stored = {
+            path: (mtime_ns, size) for path, mtime_ns, size
+            in connection.execute("SELECT path, mtime_ns, size FROM files")}
+        stats = {}
+        for path in map(os.path.abspath, iter_py_paths(*self.patterns)):
+            if path in stats:
+                continue
+            stat = os.stat(path)
+            stats[path] = (stat.st_mtime_ns, stat.st_size)
+        deleted = [path for path in stored if path not in stats]
+        changed = [
+            path for path, stat in stats.items()
+            if stored.get(path) != stat]
+        with _transaction(connection):
+            for path in deleted:
+                self.__remove(connection, path)
+            for result in self.__parse(changed, workers):
+                self.__store(connection, result, stats[result["path"]])
+        return deleted + changed
+
+    def update(self, *paths: str) -> list[str]:
+        """
+        Re-checks only the given paths, e.g. the file saved in an editor.
+        A path which no longer exists is removed from the index.
+
+        Parameters:
+        - *paths(str): Paths to re-check.
+
+        Returns:
+        - List of absolute paths whose entries changed.
+        """
+        connection = self.__connect()
+        changed = []
+        with _transaction(connection):
+            for path in map(os.path.abspath, paths):
+                row = connection.execute(
+                    "SELECT mtime_ns, size FROM files WHERE path = ?",
+                    (path,)).fetchone()
+                if not os.path.isfile(path):
+                    if row is not None:
+                        self.__remove(connection, path)
+                        changed.append(path)
+                    continue
+                stat = os.stat(path)
+                entry = (stat.st_mtime_ns, stat.st_size)
+                if row != entry:
+                    self.__store(connection, _index_file(path), entry)
+                    changed.append(path)
+        return changed
+
+    def definitions(self, name: str) -> list[Definition]:
+        """
+        Returns where the name is defined.
+
+        Parameters:
+        - name(str): Plain name ("method") or qualified name
+        ("C.method").
+
+        Returns:
+        - List of Definition, sorted by path and line.
+        """
+        return [Definition._make(row) for row in self.__connect().execute(
+            "SELECT files.path, qualname, kind, lineno, end_lineno "
+            "FROM definitions JOIN files ON files.id = file_id "
+            "WHERE name = ? OR qualname = ? "
+            "ORDER BY files.path, lineno", (name, name))]
+
+    def call_sites(self, name: str) -> list[CallSite]:
+        """
+        Returns where the name is called.
+
+        Parameters:
+        - name(str): Called function or method name.
+
+        Returns:
+        - List of CallSite, sorted by path and position.
+        """
+        return [CallSite._make(row) for row in self.__connect().execute(
+            "SELECT files.path, caller, name, lineno, col_offset "
+            "FROM calls JOIN files ON files.id = file_id "
+            "WHERE name = ? "
+            "ORDER BY files.path, lineno, col_offset", (name,))]
+
+    def close(self) -> None:
+        """
+        Closes the connection, it is opened again on next use.
+        """
+        if self.__connection is not None:
+            self.__connection.close()
+            self.__connection = None
+
+    @staticmethod
+    def __parse(paths: list[str], workers: int) -> Iterable[dict]:
+        """
+        Collects the symbols of the paths.
+
+        Parameters:
+        - paths: Paths to parse.
+        - workers(int): Process pool size, or None to parse in process.
+
+        Returns:
+        - Iterable of per-file results (see _index_file).
+        """
+        if workers is not None and len(paths) > 1:
+            return _iter_pool(_index_file, paths, workers)
+        return map(_index_file, paths)
+
+    @staticmethod
+    def __remove(connection: sqlite3.Connection, path: str) -> None:
+        """
+        Deletes the file and its rows.
+
+        Parameters:
+        - connection: SQLite connection inside a transaction.
+        - path(str): Path of the file.
+        """
+        row = connection.execute(
+            "SELECT id FROM files WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            return
+        for table in ("definitions", "calls"):
+            connection.execute(f"DELETE FROM {table} WHERE file_id = ?", row)
+        connection.execute("DELETE FROM files WHERE id = ?", row)
+
+    @staticmethod
+    def __store(
+            connection: sqlite3.Connection,
+            result: dict,
+            stat: tuple[int, int]
+    ) -> None:
+        """
+        Replaces the rows of the file with the per-file results.
+
+        Parameters:
+        - connection: SQLite connection inside a transaction.
+        - result(dict): Per-file results (see _index_file).
+        - stat: (mtime_ns, size) of the file when it was parsed.
+        """
+        row = connection.execute(
+            "SELECT id FROM files WHERE path = ?",
+            (result["path"],)).fetchone()
+        if row is None:
+            file_id = connection.execute(
+                "INSERT INTO files (path, mtime_ns, size, error) "
+                "VALUES (?, ?, ?, ?)",
+                (result["path"], *stat, result["error"])).lastrowid
+        else:
+            file_id = row[0]
+            connection.execute(
+                "UPDATE files SET mtime_ns = ?, size = ?, error = ? "
+                "WHERE id = ?", (*stat, result["error"], file_id))
+            for table in ("definitions", "calls"):
+                connection.execute(
+                    f"DELETE FROM {table} WHERE file_id = ?", (file_id,))
+        connection.executemany(
+            "INSERT INTO definitions VALUES (?, ?, ?, ?, ?, ?)",
+            _with_file_id(file_id, result["definitions"]))
+        connection.executemany(
+            "INSERT INTO calls VALUES (?, ?, ?, ?, ?)",
+            _with_file_id(file_id, result["calls"]))
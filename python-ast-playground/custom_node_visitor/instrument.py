@@ -0,0 +1,134 @@
+"""
+This module provides Instrumentation class to time
+CustomNodeVisitor.
+"""
+import ast
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class Instrumentation:
+    """
+    Opt-in recorder of call counts and cumulative time for
+    CustomNodeVisitor. It is passed as the instrument argument and
+    can be shared by many visitors to aggregate a whole scan.
+
+    Recorded names are "io", "parse" and "cache" for the file phases,
+    the visit method names (e.g. "visit_Call", and "generic_visit"
+    for nodes without visit method) and "set_doc" for docstrings.
+    A name recorded while a visit method runs is nested under it,
+    e.g. "visit_FunctionDef;set_doc". As the traversal is not
+    recursive, the time of a visit method excludes its children.
+
+    Attributes:
+    - __calls: Dictionary of name to call count.
+    - __times: Dictionary of name to cumulative time in nanoseconds.
+    - __path: List of the names being timed, outermost first.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes the Instrumentation object.
+        """
+        self.__calls = {}
+        self.__times = {}
+        self.__path = []
+
+    def __record(self, name: str, elapsed: int) -> None:
+        """
+        Adds a call and its elapsed time under the current path.
+
+        Parameters:
+        - name(str): Name of the timed phase or method.
+        - elapsed(int): Elapsed time in nanoseconds.
+        """
+        if self.__path:
+            name = ";".join(self.__path) + ";" + name
+        self.__calls[name] = self.__calls.get(name, 0) + 1
+        self.__times[name] = self.__times.get(name, 0) + elapsed
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """
+        Times the block under the name.
+
+        Parameters:
+        - name(str): Name of the timed phase.
+        """
+        start = time.perf_counter_ns()
+        self.__path.append(name)
+        try:
+            yield
+        finally:
+            self.__path.pop()
+            self.__record(name, time.perf_counter_ns() - start)
+
+    def wrap(self, name: str, method: callable) -> callable:
+        """
+        Wraps the visit method so that each call is timed.
+
+        Parameters:
+        - name(str): Name of the method.
+        - method: Bound visit method.
+
+        Returns:
+        - Wrapper function taking the node.
+        """
+        perf_counter_ns = time.perf_counter_ns
+        path = self.__path
+        record = self.__record
+
+        def timed(node: ast.AST) -> None:
+            start = perf_counter_ns()
+            path.append(name)
+            try:
+                method(node)
+            finally:
+                path.pop()
+                record(name, perf_counter_ns() - start)
+        return timed
+
+    def as_dict(self) -> dict[str: dict[str: int]]:
+        """
+        Returns the recorded data.
+
+        Returns:
+        - Dictionary of name to {"calls": int, "time_ns": int}.
+        """
+        return {
+            name: {"calls": calls, "time_ns": self.__times[name]}
+            for name, calls in self.__calls.items()}
+
+    def folded(self, root: str = "CustomNodeVisitor") -> str:
+        """
+        Returns the data in the folded-stack format of flamegraph.pl,
+        one "frame;frame value" line per stack, where the value is
+        the self time in microseconds. Visit methods are grouped
+        under a "visit" frame.
+
+        Parameters:
+        - root(str): Name of the root frame.
+
+        Returns:
+        - Folded-stack lines joined by line breaks.
+        """
+        self_times = dict(self.__times)
+        for name, elapsed in self.__times.items():
+            parent, _, _ = name.rpartition(";")
+            if parent in self_times:
+                self_times[parent] -= elapsed
+        lines = []
+        for name, elapsed in self_times.items():
+            stack = name
+            if name.startswith(("visit_", "generic_visit")):
+                stack = "visit;" + name
+            lines.append(f"{root};{stack} {max(elapsed, 0) // 1000}")
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        """
+        Clears the recorded data.
+        """
+        self.__calls.clear()
+        self.__times.clear()
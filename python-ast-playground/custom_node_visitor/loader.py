@@ -0,0 +1,36 @@
+"""
+This module provides open_source function to load sources
+for bulk jobs.
+"""
+import mmap
+import os
+from contextlib import contextmanager
+from typing import Iterator
+
+
+@contextmanager
+def open_source(
+        path: str, mmap_threshold: int = 1024 * 1024
+) -> Iterator[bytes | mmap.mmap]:
+    """
+    Opens the file as bytes for bulk jobs. Files of mmap_threshold
+    bytes or more are memory-mapped instead of being read.
+    Both can be passed to ast.parse directly, which honours
+    the BOM and the PEP 263 encoding declaration.
+
+    Parameters:
+    - path(str): Path of the file.
+    - mmap_threshold(int): Size in bytes from which the file is
+    memory-mapped (default: 1MiB).
+
+    Returns:
+    - Context manager giving bytes or a read-only mmap, which is
+    closed on exit.
+    """
+    with open(path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0 or size < mmap_threshold:
+            yield file.read()
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
@@ -0,0 +1,88 @@
+"""
+This module provides the node categories counted by CustomNodeVisitor
+and the functions to push child nodes onto its traversal stack.
+"""
+import ast
+
+
+# Node classes counted under each fixed node_count key. Any other key
+# is a called name, counted by visit_Call.
+_CATEGORY_NODES = {
+    "for": ast.For,
+    "while": ast.While,
+    "import": ast.Import,
+    "try": ast.Try,
+    "return": ast.Return,
+    "assign": ast.Assign,
+    "ann_assign": ast.AnnAssign,
+    "aug_assign": ast.AugAssign,
+    "function_def": ast.FunctionDef,
+    "async_function_def": ast.AsyncFunctionDef,
+    "class_def": ast.ClassDef,
+}
+
+
+# Definition node classes, with the node_count keys used as their kinds.
+_DEFINITION_KINDS = {
+    ast.FunctionDef: "function_def",
+    ast.AsyncFunctionDef: "async_function_def",
+    ast.ClassDef: "class_def",
+}
+
+
+# Nodes which can contain statements. Expressions never do.
+_STATEMENT_NODES = (ast.stmt, ast.excepthandler, ast.match_case)
+
+
+def _push_children(stack: list[ast.AST], node: ast.AST) -> None:
+    """
+    Pushes child nodes of the node onto the stack in reverse order,
+    so that popping them gives the order of ast.iter_child_nodes.
+
+    Parameters:
+    - stack: Traversal stack.
+    - node: AST node whose children are pushed.
+    """
+    for field in reversed(node._fields):
+        value = getattr(node, field, None)
+        if isinstance(value, list):
+            for item in reversed(value):
+                if isinstance(item, ast.AST):
+                    stack.append(item)
+        elif isinstance(value, ast.AST):
+            stack.append(value)
+
+
+def _push_statements(stack: list[ast.AST], node: ast.AST) -> None:
+    """
+    Same as _push_children, but only pushes nodes which can contain
+    statements, so that expression subtrees are skipped.
+
+    Parameters:
+    - stack: Traversal stack.
+    - node: AST node whose children are pushed.
+    """
+    for field in reversed(node._fields):
+        value = getattr(node, field, None)
+        # Statements are always held in lists (body, orelse, ...).
+        if isinstance(value, list):
+            for item in reversed(value):
+                if isinstance(item, _STATEMENT_NODES):
+                    stack.append(item)
+
+
+def _first_line(node: ast.stmt) -> int:
+    """
+    Returns the first line of the statement. lineno of a decorated
+    definition is the line of "def" or "class", after its decorators.
+
+    Parameters:
+    - node: Statement node.
+
+    Returns:
+    - Line number of the first decorator, or lineno.
+    """
+    decorators = getattr(node, "decorator_list", None)
+    if decorators:
+        return decorators[0].lineno
+    return node.lineno
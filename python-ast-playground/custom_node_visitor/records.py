@@ -0,0 +1,108 @@
+"""
+This module provides NodeEvent and DocRecord classes,
+the records produced by CustomNodeVisitor.
+"""
+import ast
+from typing import NamedTuple
+
+
+class NodeEvent(NamedTuple):
+    """
+    Event yielded by CustomNodeVisitor.iter_events.
+
+    Attributes:
+    - kind: "call" for calls, otherwise the node_count key such as
+    "for", "import" or "function_def".
+    - name: Called name for calls, defined name for definitions,
+    otherwise None.
+    - lineno: Line number of the node.
+    """
+    kind: str
+    name: str | None
+    lineno: int
+
+
+class DocRecord:
+    """
+    Compact doc_list entry. It keeps the raw docstring found in
+    the node and cleans it like ast.get_docstring only when doc is
+    first accessed, as most consumers only look at the names.
+
+    Attributes:
+    - class_name: Class name of the node, "Module" for the module.
+    - name: Name of the definition, "Module" for the module.
+    - __doc: Raw docstring until cleaned, then the cleaned docstring,
+    None if the node has no docstring.
+    - __raw: True while __doc is not cleaned yet.
+    """
+
+    __slots__ = ("class_name", "name", "__doc", "__raw")
+
+    def __init__(
+            self, class_name: str, name: str,
+            doc: str = None, raw: bool = False) -> None:
+        """
+        Initializes the DocRecord object.
+
+        Parameters:
+        - class_name(str): Class name of the node.
+        - name(str): Name of the definition.
+        - doc(str): Docstring, or None.
+        - raw(bool): True if doc still has to be cleaned.
+        """
+        self.class_name = class_name
+        self.name = name
+        self.__doc = doc
+        self.__raw = raw and doc is not None
+
+    @classmethod
+    def from_node(
+            cls, node: ast.AST,
+            class_name: str, name: str) -> "DocRecord":
+        """
+        Creates a record holding the raw docstring of the node,
+        found the same way as ast.get_docstring.
+
+        Parameters:
+        - node: FunctionDef, AsyncFunctionDef, ClassDef or Module node.
+        - class_name(str): Class name of the node.
+        - name(str): Name of the definition.
+
+        Returns:
+        - DocRecord object.
+        """
+        doc = None
+        if node.body and isinstance(node.body[0], ast.Expr):
+            value = node.body[0].value
+            if isinstance(value, ast.Constant) and isinstance(
+                    value.value, str):
+                doc = value.value
+        return cls(class_name, name, doc, raw=True)
+
+    @property
+    def doc(self) -> str | None:
+        """
+        Property method to get the cleaned docstring.
+
+        Returns:
+        - The docstring, or None.
+        """
+        if self.__raw:
+            # Imported here like ast.get_docstring, inspect is slow
+            # to import.
+            import inspect
+            self.__doc = inspect.cleandoc(self.__doc)
+            self.__raw = False
+        return self.__doc
+
+    def as_dict(self) -> dict[str: str]:
+        """
+        Returns the record as a doc_list dictionary.
+
+        Returns:
+        - Dictionary with "class", "name" and "doc" keys.
+        """
+        return {"class": self.class_name, "name": self.name, "doc": self.doc}
+
+    def __repr__(self) -> str:
+        return f"DocRecord({self.class_name!r}, {self.name!r})"
@@ -0,0 +1,108 @@
+"""
+This module provides Scope and ScopeIndex classes, the interval index
+of function and class definitions built by CustomNodeVisitor.
+"""
+from bisect import bisect_right
+from typing import Iterable, Iterator, NamedTuple
+
+
+class Scope(NamedTuple):
+    """
+    A function or class definition, as a span of lines.
+
+    Attributes:
+    - kind: "function_def", "async_function_def" or "class_def".
+    - qualname: Qualified name like __qualname__, e.g. "C.method"
+    or "outer.<locals>.inner".
+    - lineno: Line of the def or class keyword.
+    - end_lineno: Last line of the definition.
+    """
+    kind: str
+    qualname: str
+    lineno: int
+    end_lineno: int
+
+
+class ScopeIndex:
+    """
+    Answers which definition encloses a line in O(log n).
+
+    Definitions are either nested or disjoint, so the lines split into
+    runs with the same innermost definition. The index keeps the first
+    line of every run and its definition, and a lookup is one binary
+    search. Lines of decorators belong to the enclosing scope, where
+    they run, as in tracebacks.
+
+    Attributes:
+    - __scopes: List of the Scope objects in source order.
+    - __starts: First line of every run.
+    - __owners: Innermost Scope of every run, None outside
+    of any definition.
+    """
+
+    def __init__(
+            self, definitions: Iterable[tuple[str, str, int, int]]) -> None:
+        """
+        Initializes the ScopeIndex object.
+
+        Parameters:
+        - definitions: Tuples of (kind, name, lineno, end_lineno),
+        e.g. in visiting order.
+        """
+        self.__scopes = []
+        self.__starts = []
+        self.__owners = []
+        # Outer definitions first when two start on the same line.
+        rows = sorted(definitions, key=lambda row: (row[2], -row[3]))
+        # Definitions enclosing the current line, innermost last.
+        open_scopes = []
+        for kind, name, lineno, end_lineno in rows:
+            while open_scopes and open_scopes[-1].end_lineno < lineno:
+                self.__close(open_scopes)
+            if not open_scopes:
+                qualname = name
+            elif open_scopes[-1].kind == "class_def":
+                qualname = f"{open_scopes[-1].qualname}.{name}"
+            else:
+                qualname = f"{open_scopes[-1].qualname}.<locals>.{name}"
+            scope = Scope(kind, qualname, lineno, end_lineno)
+            self.__scopes.append(scope)
+            open_scopes.append(scope)
+            self.__starts.append(lineno)
+            self.__owners.append(scope)
+        while open_scopes:
+            self.__close(open_scopes)
+
+    def __close(self, open_scopes: list[Scope]) -> None:
+        """
+        Ends the run of the innermost open definition, and starts
+        a run of the definition around it after its last line.
+
+        Parameters:
+        - open_scopes: Definitions enclosing the current line.
+        """
+        scope = open_scopes.pop()
+        self.__starts.append(scope.end_lineno + 1)
+        self.__owners.append(open_scopes[-1] if open_scopes else None)
+
+    def __len__(self) -> int:
+        return len(self.__scopes)
+
+    def __iter__(self) -> Iterator[Scope]:
+        return iter(self.__scopes)
+
+    def enclosing(self, lineno: int) -> Scope | None:
+        """
+        Returns the innermost definition enclosing the line.
+
+        Parameters:
+        - lineno(int): Line number, from 1.
+
+        Returns:
+        - Scope object, or None if the line is at the module level.
+        """
+        # Runs may start on the same line, the last one wins.
+        index = bisect_right(self.__starts, lineno) - 1
+        if index < 0:
+            return None
+        return self.__owners[index]
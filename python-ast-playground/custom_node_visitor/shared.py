@@ -0,0 +1,331 @@
+"""
+This module provides SharedCounts class and scan_totals function,
+a multi-process scan which aggregates the counts in shared memory
+instead of sending per-file results back to the parent process.
+"""
+import multiprocessing
+import operator
+import os
+import zlib
+from itertools import islice
+from multiprocessing.sharedctypes import RawArray, RawValue
+from typing import Iterable, Iterator
+
+from .batch import _iter_pool, _worker_visitor, iter_py_paths
+from .counters import CounterStore
+from .nodes import _CATEGORY_NODES
+
+
+class SharedCounts:
+    """
+    node_count totals of several processes in shared memory.
+
+    Keys are interned into slots by a name table shared by all the
+    processes, an open addressing hash table whose key bytes are kept
+    by slot. Each process adds to a row of counts of its own, so that
+    counting takes no lock, and only interning a key no process has
+    seen takes the lock. Slots never change once interned, so every
+    process caches the slots of the keys it has seen.
+
+    The object is given to the pool processes when they start
+    (e.g. as an initializer argument), it can not be pickled later.
+
+    Attributes:
+    - rows: Number of rows, one per process.
+    - max_keys: Maximum number of interned keys.
+    - key_bytes: Maximum length of a key in UTF-8 bytes.
+    - __lock: Lock for interning and claiming rows.
+    - __table: Hash table of slot + 1 per bucket, 0 for empty buckets.
+    - __keys: Key bytes, key_bytes per slot.
+    - __lengths: Length of the key bytes by slot.
+    - __size: Number of interned keys.
+    - __next_row: Number of claimed rows.
+    - __counts: rows rows of max_keys + 1 counts, the sum of the row
+    then the count of each slot.
+    - __slots: Dictionary of key to slot, cache of this process.
+    """
+
+    def __init__(
+            self,
+            rows: int,
+            max_keys: int = 1 << 16,
+            key_bytes: int = 64
+    ) -> None:
+        """
+        Initializes the SharedCounts object.
+
+        Parameters:
+        - rows(int): Number of rows, one per process.
+        - max_keys(int): Maximum number of interned keys
+        (default: 65536).
+        - key_bytes(int): Maximum length of a key in UTF-8 bytes
+        (default: 64).
+
+        Raises:
+        - ValueError: rows, max_keys or key_bytes is less than 1.
+        """
+        if rows < 1 or max_keys < 1 or key_bytes < 1:
+            raise ValueError(
+                "rows, max_keys and key_bytes must be positive.")
+        self.rows = rows
+        self.max_keys = max_keys
+        self.key_bytes = key_bytes
+        self.__lock = multiprocessing.Lock()
+        # At most half full, so that probe sequences stay short.
+        buckets = 1 << (2 * max_keys - 1).bit_length()
+        self.__table = RawArray('i', buckets)
+        self.__keys = RawArray('c', max_keys * key_bytes)
+        self.__lengths = RawArray('i', max_keys)
+        self.__size = RawValue('i', 0)
+        self.__next_row = RawValue('i', 0)
+        self.__counts = RawArray('q', rows * (max_keys + 1))
+        self.__slots = {}
+
+    def __len__(self) -> int:
+        return self.__size.value
+
+    def claim_row(self) -> int:
+        """
+        Returns a row no other process has claimed.
+
+        Returns:
+        - Row index.
+
+        Raises:
+        - RuntimeError: All the rows are claimed.
+        """
+        with self.__lock:
+            row = self.__next_row.value
+            if row >= self.rows:
+                raise RuntimeError("All the rows are claimed.")
+            self.__next_row.value = row + 1
+        return row
+
+    def __key_bytes(self, slot: int) -> bytes:
+        """
+        Returns the key bytes of the slot.
+
+        Parameters:
+        - slot(int): Slot index.
+
+        Returns:
+        - UTF-8 bytes of the key.
+        """
+        start = slot * self.key_bytes
+        return self.__keys[start:start + self.__lengths[slot]]
+
+    def intern(self, key: str) -> int | None:
+        """
+        Returns the slot of the key, adding it if needed.
+
+        Parameters:
+        - key(str): node_count key.
+
+        Returns:
+        - Slot index, or None if the key is longer than key_bytes
+        or the table is full.
+        """
+        slot = self.__slots.get(key)
+        if slot is not None:
+            return slot
+        data = key.encode("utf-8", "surrogatepass")
+        if len(data) > self.key_bytes:
+            return None
+        table = self.__table
+        mask = len(table) - 1
+        # crc32 is the same in every process, unlike hash of str.
+        bucket = zlib.crc32(data) & mask
+        with self.__lock:
+            while True:
+                entry = table[bucket]
+                if not entry:
+                    slot = self.__size.value
+                    if slot >= self.max_keys:
+                        return None
+                    start = slot * self.key_bytes
+                    self.__keys[start:start + len(data)] = data
+                    self.__lengths[slot] = len(data)
+                    self.__size.value = slot + 1
+                    table[bucket] = slot + 1
+                    break
+                if self.__key_bytes(entry - 1) == data:
+                    slot = entry - 1
+                    break
+                bucket = (bucket + 1) & mask
+        self.__slots[key] = slot
+        return slot
+
+    def add(self, row: int, slot: int, count: int) -> None:
+        """
+        Adds to the count of the slot in the row.
+
+        Parameters:
+        - row(int): Row claimed by this process.
+        - slot(int): Slot index.
+        - count(int): Count to add.
+        """
+        self.__counts[row * (self.max_keys + 1) + slot + 1] += count
+
+    def add_sum(self, row: int, value: int) -> None:
+        """
+        Adds to the sum of the row.
+
+        Parameters:
+        - row(int): Row claimed by this process.
+        - value(int): Number of visited nodes to add.
+        """
+        self.__counts[row * (self.max_keys + 1)] += value
+
+    def totals(self) -> tuple[dict[str: int], int]:
+        """
+        Adds up the rows. Call it once the processes are done.
+
+        Returns:
+        - Tuple of the node_count dictionary, in interning order,
+        and the sum.
+        """
+        size = self.__size.value
+        width = self.max_keys + 1
+        counts = self.__counts
+        totals = [0] * (size + 1)
+        for row in range(self.rows):
+            start = row * width
+            totals = list(map(
+                operator.add, totals, counts[start:start + size + 1]))
+        node_count = {}
+        for slot in range(size):
+            if totals[slot + 1]:
+                key = self.__key_bytes(slot).decode("utf-8", "surrogatepass")
+                node_count[key] = totals[slot + 1]
+        return node_count, totals[0]
+
+
+# SharedCounts of this pool process and its row, set by _init_worker.
+_worker_counts = None
+_worker_row = None
+
+
+def _init_worker(counts: SharedCounts) -> None:
+    """
+    Pool initializer, claims a row of the shared counts.
+
+    Parameters:
+    - counts(SharedCounts): Shared counts of the scan.
+    """
+    global _worker_counts, _worker_row
+    _worker_counts = counts
+    _worker_row = counts.claim_row()
+
+
+def _count_files(
+        paths: list[str],
+        categories: Iterable[str] = None,
+        fast: bool = False
+) -> dict:
+    """
+    Worker function to visit a chunk of files in a pool process and
+    add their counts to the row of this process. Only the errors and
+    the keys the name table can not hold are sent back, which are rare.
+
+    Parameters:
+    - paths(list): Paths of the files to be visited.
+    - categories: Optional node_count keys to count.
+    - fast(bool): Use the fast path of CustomNodeVisitor.
+
+    Returns:
+    - Dictionary with "files", "errors" and "overflow" keys.
+    """
+    visitor = _worker_visitor(None, categories, fast)
+    store = CounterStore(dense=True)
+    total = 0
+    errors = []
+    for path in paths:
+        try:
+            visitor.analyze(path, is_path=True)
+        except Exception as e:
+            errors.append({
+                "path": path, "error": f"{e.__class__.__name__}: {e}"})
+            continue
+        store.update(visitor.node_count)
+        total += visitor.sum
+    counts = _worker_counts
+    row = _worker_row
+    overflow = {}
+    for key, count in store.as_dict().items():
+        slot = counts.intern(key)
+        if slot is None:
+            overflow[key] = count
+        else:
+            counts.add(row, slot, count)
+    counts.add_sum(row, total)
+    return {"files": len(paths), "errors": errors, "overflow": overflow}
+
+
+def _chunks(paths: Iterable[str], size: int) -> Iterator[list[str]]:
+    """
+    Lazily splits the paths into lists.
+
+    Parameters:
+    - paths: Iterable of file paths.
+    - size(int): Number of paths per list.
+
+    Returns:
+    - Iterator of path lists.
+    """
+    iterator = iter(paths)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def scan_totals(
+        *patterns: str,
+        workers: int = None,
+        chunk_size: int = 64,
+        categories: Iterable[str] = None,
+        fast: bool = False,
+        max_keys: int = 1 << 16
+) -> dict:
+    """
+    Visits every python file matched by the patterns in a process pool
+    like scan, but the workers add their counts to SharedCounts
+    and the parent reads the totals once at the end, so that no
+    per-file result is pickled. Files are sent to the workers
+    in chunks for the same reason.
+
+    Parameters:
+    - *patterns(str): Directories, file paths or glob patterns.
+    - workers(int): Number of worker processes (default: cpu count).
+    - chunk_size(int): Number of files per task (default: 64).
+    - categories: Optional node_count keys to count.
+    - fast(bool): Use the fast path of CustomNodeVisitor.
+    - max_keys(int): Maximum number of keys in shared memory, further
+    keys are sent back with the chunk results (default: 65536).
+
+    Returns:
+    - Dictionary with "files", "node_count", "sum" and "errors" keys,
+    the same totals as scan without doc_list. Keys of node_count
+    are in interning order, which varies between runs.
+
+    Raises:
+    - ValueError: workers or chunk_size is less than 1.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers < 1 or chunk_size < 1:
+        raise ValueError("workers and chunk_size must be positive.")
+    counts = SharedCounts(workers, max_keys)
+    # The fixed category keys take the first slots, as in SYMBOLS.
+    for key in _CATEGORY_NODES:
+        counts.intern(key)
+    report = {"files": 0, "node_count": {}, "sum": 0, "errors": []}
+    overflow = CounterStore()
+    for result in _iter_pool(
+            _count_files, _chunks(iter_py_paths(*patterns), chunk_size),
+            workers, None, categories, fast,
+            initializer=_init_worker, initargs=(counts,)):
+        report["files"] += result["files"]
+        report["errors"].extend(result["errors"])
+        overflow.update(result["overflow"])
+    node_count, report["sum"] = counts.totals()
+    node_count.update(overflow.as_dict())
+    report["node_count"] = node_count
+    return report
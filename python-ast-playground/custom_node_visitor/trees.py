@@ -0,0 +1,167 @@
+"""
+This module provides TreeCache class to share parsed trees
+between CustomNodeVisitor objects in one process.
+"""
+import ast
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class TreeCache:
+    """
+    In-process LRU cache of parsed trees, keyed by the content hash
+    of the source. Visitors given the same TreeCache parse a source
+    once and share the tree, e.g. to analyze a file again with other
+    categories or analyzers. Memory is bounded by the total size of
+    the cached sources, and the least recently used trees are evicted
+    beyond max_bytes. A tree takes several times the memory of its
+    source, so max_bytes is a proxy, not the exact footprint.
+
+    The trees are shared, so visitors and analyzers must not modify
+    them (e.g. with NodeTransformer).
+
+    Attributes:
+    - max_bytes: Size cap of the cached sources in bytes.
+    - __trees: OrderedDict of key to (tree, size), oldest first.
+    - __size: Total size of the cached sources.
+    - __hits: Number of parses served from the cache.
+    - __misses: Number of parses done.
+    - __lock: Lock for visitors in several threads.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024) -> None:
+        """
+        Initializes the TreeCache object.
+
+        Parameters:
+        - max_bytes(int): Size cap of the cached sources in bytes
+        (default: 64MiB).
+
+        Raises:
+        - ValueError: max_bytes is less than 1.
+        """
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be positive.")
+        self.max_bytes = max_bytes
+        self.__trees = OrderedDict()
+        self.__size = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        """
+        Returns the state to pickle, without the trees, so that
+        pool processes start with an empty cache of their own.
+        """
+        return {"max_bytes": self.max_bytes}
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Restores the pickled state.
+        """
+        self.__init__(state["max_bytes"])
+
+    def __len__(self) -> int:
+        return len(self.__trees)
+
+    @property
+    def size(self) -> int:
+        """
+        Property method to get the total size of the cached sources.
+
+        Returns:
+        - Size in bytes.
+        """
+        return self.__size
+
+    @property
+    def hits(self) -> int:
+        """
+        Property method to get the number of parses served
+        from the cache.
+
+        Returns:
+        - Number of hits.
+        """
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        """
+        Property method to get the number of parses done.
+
+        Returns:
+        - Number of misses.
+        """
+        return self.__misses
+
+    @staticmethod
+    def key(source: str | bytes) -> bytes:
+        """
+        Returns the cache key of the source.
+
+        Parameters:
+        - source: Source string, or bytes-like object of a file.
+
+        Returns:
+        - sha256 digest, tagged with the source type because bytes
+        honour the PEP 263 encoding declaration and strings do not.
+        """
+        if isinstance(source, str):
+            digest = hashlib.sha256(b"s")
+            digest.update(source.encode("utf-8", "surrogatepass"))
+        else:
+            digest = hashlib.sha256(b"b")
+            digest.update(source)
+        return digest.digest()
+
+    def parse(
+            self,
+            source: str | bytes,
+            filename: str = "<unknown>"
+    ) -> ast.Module:
+        """
+        Returns the cached tree of the source, or parses and caches it.
+        Sources which raise are not cached.
+
+        Parameters:
+        - source: Source string, or bytes-like object of a file.
+        - filename(str): File name for syntax errors.
+
+        Returns:
+        - Module node, shared with other callers.
+
+        Raises:
+        - SyntaxError, ValueError: The source can not be parsed.
+        """
+        key = self.key(source)
+        with self.__lock:
+            entry = self.__trees.get(key)
+            if entry is not None:
+                self.__trees.move_to_end(key)
+                self.__hits += 1
+                return entry[0]
+        # Parsed without the lock, so that threads parse in parallel
+        # as far as the GIL allows.
+        tree = ast.parse(source, filename)
+        size = len(source)
+        with self.__lock:
+            self.__misses += 1
+            if size > self.max_bytes or key in self.__trees:
+                return tree
+            self.__trees[key] = (tree, size)
+            self.__size += size
+            while self.__size > self.max_bytes:
+                _, (_, evicted) = self.__trees.popitem(last=False)
+                self.__size -= evicted
+        return tree
+
+    def clear(self) -> None:
+        """
+        Drops all trees.
+        """
+        with self.__lock:
+            self.__trees.clear()
+            self.__size = 0
@@ -0,0 +1,1646 @@
+"""
+This module provides CustomNodeVisitor class
+inherited from NodeVisitor class
+"""
+import ast
+import os
+from bisect import bisect_left, bisect_right
+from contextlib import ExitStack, nullcontext
+from string import Formatter
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+from .counters import CounterStore
+from .loader import open_source
+from .nodes import (
+    _CATEGORY_NODES, _DEFINITION_KINDS, _first_line, _push_children,
+    _push_statements)
+from .records import DocRecord, NodeEvent
+from .scopes import ScopeIndex
+
+if TYPE_CHECKING:
+    from .cache import ResultCache
+    from .instrument import Instrumentation
+    from .trees import TreeCache
+
+
+# Longer strings are never taken as a path (PATH_MAX on Linux).
+_PATH_MAX = 4096
+
+
+# Timer used when instrumentation is disabled.
+_NULL_TIMER = nullcontext()
+
+
+# Parser of str.format strings.
+_FORMATTER = Formatter()
+
+
+def _format_specifiers(text: str) -> Iterator[str]:
+    """
+    Yields the field names, conversions ("!r") and format specs
+    of the replacement fields in the format string. A format spec
+    holding nested fields ("{:{width}}") yields the nested fields
+    instead of itself.
+
+    Parameters:
+    - text(str): Format string.
+
+    Returns:
+    - Iterator of specifier strings.
+
+    Raises:
+    - ValueError: The format string is malformed.
+    """
+    for _, field_name, format_spec, conversion in _FORMATTER.parse(text):
+        if field_name is None:
+            continue
+        if field_name:
+            yield field_name
+        if conversion:
+            yield "!" + conversion
+        if "{" in format_spec:
+            yield from _format_specifiers(format_spec)
+        elif format_spec:
+            yield format_spec
+
+
+def _is_hostable(analyzer: ast.NodeVisitor) -> bool:
+    """
+    Tells whether the analyzer can be hosted. Hosting is opted into
+    with defer_children = True on the analyzer class, which accepts
+    that the children are visited after the visit method returns.
+    Analyzers overriding visit or generic_visit are never hosted.
+
+    Parameters:
+    - analyzer: NodeVisitor object.
+
+    Returns:
+    - True if the analyzer can be hosted, False otherwise.
+    """
+    analyzer_class = type(analyzer)
+    return (
+        getattr(analyzer_class, "defer_children", False) is True
+        and analyzer_class.visit is ast.NodeVisitor.visit
+        and analyzer_class.generic_visit is ast.NodeVisitor.generic_visit)
+
+
+def _walk(analyzer: ast.NodeVisitor, node: ast.AST) -> None:
+    """
+    Visits the node with the analyzer on its own, like
+    analyzer.visit, and calls its leave_* methods once the visit
+    method of a node returns, i.e. after its subtree.
+
+    Parameters:
+    - analyzer: NodeVisitor object which is not hosted.
+    - node: AST node to visit.
+    """
+    if not any(name.startswith("leave_") for name in dir(analyzer)):
+        analyzer.visit(node)
+        return
+    visit = analyzer.visit
+
+    def visit_and_leave(child: ast.AST) -> any:
+        result = visit(child)
+        leave = getattr(
+            analyzer, 'leave_' + child.__class__.__name__, None)
+        if leave is not None:
+            leave(child)
+        return result
+    # generic_visit of NodeVisitor visits the children through it.
+    analyzer.visit = visit_and_leave
+    try:
+        visit_and_leave(node)
+    finally:
+        del analyzer.visit
+
+
+class _Descend:
+    """
+    Replaces generic_visit of a hosted analyzer while the host visitor
+    runs. The host descends by itself, this only records that
+    the analyzer asked to.
+    """
+    __slots__ = ("called",)
+
+    def __init__(self) -> None:
+        self.called = False
+
+    def __call__(self, node: ast.AST) -> None:
+        self.called = True
+
+
+class _Resume:
+    """
+    Stack marker put below the children of a node whose hosted
+    analyzer did not call generic_visit. The analyzer is skipped
+    until the marker is popped, i.e. until the subtree is done.
+    """
+    __slots__ = ("slot",)
+
+    def __init__(self, slot: int) -> None:
+        self.slot = slot
+
+
+class _Leave:
+    """
+    Stack marker put below the children of a node whose class has
+    a leave method, popped once the subtree is done to call it.
+    """
+    __slots__ = ("handler", "node")
+
+    def __init__(self, handler: callable, node: ast.AST) -> None:
+        self.handler = handler
+        self.node = node
+
+
+# Visitor class -> whether its children can be deferred.
+_DEFERS = {}
+
+
+def _defers_children(visitor_class: type) -> bool:
+    """
+    Tells whether generic_visit of the CustomNodeVisitor subclass may
+    only push the children, to be visited after the calling visit
+    method returns. The most derived class which either sets
+    defer_children or defines generic_visit or a visit_* method
+    decides, so a subclass overriding visit methods without setting
+    defer_children = True gets the recursive generic_visit of
+    NodeVisitor.
+
+    Parameters:
+    - visitor_class: CustomNodeVisitor or a subclass.
+
+    Returns:
+    - True if the children can be deferred, False otherwise.
+    """
+    defers = _DEFERS.get(visitor_class)
+    if defers is not None:
+        return defers
+    defers = True
+    for base in visitor_class.__mro__:
+        if base is CustomNodeVisitor:
+            break
+        names = vars(base)
+        if "defer_children" in names:
+            defers = bool(names["defer_children"])
+            break
+        if "generic_visit" in names or any(
+                name.startswith("visit_") for name in names):
+            defers = False
+            break
+    _DEFERS[visitor_class] = defers
+    return defers
+
+
+class CustomNodeVisitor(ast.NodeVisitor):
+    """
+    Custom AST NodeVisitor class for counting occurrences of specific nodes.
+
+    Attributes:
+    - defer_children: Class attribute, True if the visit methods
+    leave work which needs the children visited to leave_* methods,
+    so that generic_visit only pushes the children (see generic_visit).
+    A subclass overriding generic_visit or a visit_* method sets it
+    again to keep the fast traversal, otherwise its generic_visit
+    visits the children before returning, like NodeVisitor.
+    - script: the script to be parsed, or the path to be read and parsed.
+    - tree: the parsed ast tree, None when the results were
+    restored from a ResultCache.
+    - __sum: Total count of nodes visited.
+    - __last_node: Last node of the initial node.
+    - __node_count: CounterStore to store counts of different node types.
+    - __format_specifiers: Set of the field names, conversions and
+    format specs of the format strings, to check specifiers.
+    _ __doc_list: List to store the DocRecord of the module,
+    classes and functions.
+    - __stack: Explicit stack of nodes waiting to be visited
+    while a traversal is running, otherwise None.
+    - __stack_buffer: List reused as the stack of outermost visits.
+    - __dispatch: Dictionary to cache the visit method of each node
+    class, None for classes counted inline by the traversal.
+    - __events: List of pending NodeEvent while iter_events is running,
+    otherwise None.
+    - __categories: Set of requested node_count keys, None for all.
+    - __wanted_nodes: Node classes whose visit method is dispatched,
+    None for all.
+    - __push: Function to push child nodes onto the stack, which
+    skips expression subtrees when no call is requested.
+    - __is_path: True if script is a path, False if it is a source,
+    None to decide by the script itself.
+    - __cache: Optional ResultCache of results.
+    - __instrument: Optional Instrumentation to record timings.
+    - __analyzers: List of the registered NodeVisitor analyzers.
+    - __hosted: List of flags, False for the analyzers which are
+    walked separately after the traversal.
+    - __active: List of flags, False while an analyzer skips
+    a subtree.
+    - __descends: List of the _Descend recorders of the analyzers.
+    - __tree_cache: Optional TreeCache of parsed trees.
+    - __fast: True to count the categories with count_statements
+    when they allow it.
+    - __scopes: List of (kind, name, lineno, end_lineno) of the visited
+    definitions, None if scopes are not recorded.
+    - __scope_index: ScopeIndex of __scopes, built on first access.
+    - __low_memory: True to parse and visit one top-level statement
+    at a time, keeping neither the source nor the tree.
+    - __defer: True if generic_visit only pushes the children,
+    see defer_children.
+    - __line_offset: Number of lines before the statement being
+    visited in the low-memory mode, otherwise 0.
+    """
+    defer_children = True
+
+    def __init__(
+            self,
+            script: str = None,
+            cache: "ResultCache" = None,
+            categories: Iterable[str] = None,
+            *,
+            is_path: bool = None,
+            instrument: "Instrumentation" = None,
+            analyzers: Iterable[ast.NodeVisitor] = (),
+            tree_cache: "TreeCache" = None,
+            fast: bool = False,
+            scopes: bool = False,
+            low_memory: bool = False
+    ) -> None:
+        """
+        Initializes the CustomNodeVisitor object, and analyzes
+        the script if given. A visitor created without script can
+        analyze many scripts one after another with analyze, reusing
+        its buffers and dispatch table.
+
+        Parameters:
+        - script(str): The script or the path to be visited.
+        - cache(ResultCache): Optional cache of results. If the content
+        of the script was visited before, parsing and visiting
+        are skipped.
+        - categories: Optional node_count keys to count, e.g.
+        ("import", "while", "print"). Only the visit methods needed
+        for them are dispatched, and expression subtrees are skipped
+        unless a called name is requested. node_count and doc_list
+        then only hold the requested categories, and sum only counts
+        the visited nodes.
+        - is_path(bool): True if script is a path, False if it is
+        a source. If None, a script with a line break is a source,
+        otherwise it is a path if it exists.
+        - instrument(Instrumentation): Optional object to record
+        call counts and time of I/O, parsing and each visit method.
+        - analyzers: NodeVisitor objects to run in the same traversal
+        (see register).
+        - tree_cache(TreeCache): Optional cache of parsed trees shared
+        with other visitors, so that a source analyzed again is not
+        parsed again. tree is then shared and must not be modified.
+        - fast(bool): If categories only has "import", "function_def",
+        "async_function_def" and "class_def", count them with a token
+        scan (see count_statements) without parsing. tree and
+        last_node are then None, sum is 0 and doc_list is empty.
+        Other categories, analyzers or a source the scan can not
+        handle fall back to parsing.
+        - scopes(bool): If True, record the line spans of the visited
+        definitions, whatever the categories, so that scope_index
+        can find the definition enclosing a line. The cache and
+        the fast path are then not used.
+        - low_memory(bool): If True, read the script line by line and
+        parse and visit one top-level statement at a time (see
+        iter_chunks), so that memory is bounded by the largest
+        statement instead of the whole file, e.g. for huge generated
+        modules. tree is then None, script is None for a source,
+        the Module node is not visited (hosted analyzers do not see
+        it) and the caches are not used. The fast path is still
+        used when enabled.
+
+        Raises:
+        - ValueError: categories is empty.
+        """
+        self.tree = None
+        self.script = None
+        self.__sum = 0
+        self.__last_node = None
+        self.__node_count = CounterStore()
+        self.__format_specifiers = set()
+        self.__doc_list = []
+        self.__stack = None
+        self.__stack_buffer = []
+        self.__dispatch = {_Leave: self.__leave}
+        self.__events = None
+        self.__is_path = None
+        self.__cache = cache
+        self.__instrument = instrument
+        self.__categories = None
+        self.__wanted_nodes = None
+        self.__push = _push_children
+        self.__analyzers = []
+        self.__hosted = []
+        self.__active = []
+        self.__descends = []
+        self.__tree_cache = tree_cache
+        self.__fast = fast
+        self.__scopes = [] if scopes else None
+        self.__scope_index = None
+        self.__low_memory = low_memory
+        self.__line_offset = 0
+        self.__defer = _defers_children(type(self))
+        if categories is not None:
+            self.__set_categories(categories)
+        for analyzer in analyzers:
+            self.register(analyzer)
+        if script is not None:
+            self.analyze(script, is_path=is_path)
+
+    def reset(self) -> None:
+        """
+        Clears the results of the last analysis. The buffers are
+        cleared in place and the dispatch table is kept, so that
+        a long-lived visitor keeps a steady allocation profile.
+        """
+        self.tree = None
+        self.script = None
+        self.__sum = 0
+        self.__last_node = None
+        self.__node_count.clear()
+        self.__format_specifiers.clear()
+        self.__doc_list.clear()
+        if self.__scopes is not None:
+            self.__scopes.clear()
+            self.__scope_index = None
+
+    def analyze(
+            self, script: str, *, is_path: bool = None
+    ) -> "CustomNodeVisitor":
+        """
+        Resets the visitor, then parses and visits the script with
+        the cache, categories and instrumentation given to __init__.
+
+        Parameters:
+        - script(str): The script or the path to be visited.
+        - is_path(bool): True if script is a path, False if it is
+        a source, None to decide by the script itself.
+
+        Returns:
+        - The visitor itself.
+        """
+        self.reset()
+        self.__is_path = is_path
+        # The low-memory mode does not keep a source.
+        if not self.__low_memory or self.__is_script_path(script):
+            self.script = script
+        if self.__is_fast() and self.__analyze_fast(script):
+            return self
+        if self.__low_memory:
+            self.__analyze_chunks(script)
+        # Results of hosted analyzers and scopes can not be restored
+        # from a cache.
+        elif (self.__cache is None or self.__analyzers
+                or self.__scopes is not None):
+            self.__set_ast_tree(script)
+            self.visit(self.tree)
+        else:
+            self.__analyze_cached(script, self.__cache)
+        if self.__categories is not None:
+            # visit_Call counts every called name.
+            self.__node_count.retain(self.__categories)
+        return self
+
+    def __is_fast(self) -> bool:
+        """
+        Decides whether the fast path can produce the results.
+
+        Returns:
+        - True if fast is set, all the categories are available from
+        count_statements, and neither analyzers nor scopes are
+        needed, False otherwise.
+        """
+        if not self.__fast or self.__categories is None:
+            return False
+        # Imported here, only the fast path needs re.
+        from .fastpath import _FAST_CATEGORIES
+        return (
+            self.__categories <= _FAST_CATEGORIES
+            and not self.__analyzers
+            and self.__scopes is None)
+
+    def __analyze_fast(self, script: str) -> bool:
+        """
+        Counts the categories of the script with count_statements.
+
+        Parameters:
+        - script(str): The script or the path.
+
+        Returns:
+        - True if the counts are set, False if the source has to be
+        parsed instead.
+        """
+        from .fastpath import count_statements
+        with ExitStack() as stack:
+            source, _ = self.__load_script(script, stack)
+            with self.__timer("scan"):
+                counts = count_statements(source)
+        if counts is None:
+            return False
+        self.__node_count.merge(counts)
+        self.__node_count.retain(self.__categories)
+        return True
+
+    def __analyze_chunks(self, script: str) -> None:
+        """
+        Parses and visits the script one top-level statement at a time.
+        Each chunk is dropped once visited.
+
+        Parameters:
+        - script(str): The script or the path to be visited.
+
+        Raises:
+        - SyntaxError: The script can not be parsed, with the line
+        numbers of the whole script.
+        """
+        # Imported here, only the low-memory mode needs tokenize.
+        from .chunks import iter_chunks, iter_file_lines, iter_text_lines
+        with ExitStack() as stack:
+            if self.__is_script_path(script):
+                with self.__timer("io"):
+                    file = stack.enter_context(open(script, "rb"))
+                lines = iter_file_lines(file)
+                filename = script
+            else:
+                lines = iter_text_lines(script)
+                filename = "<unknown>"
+            # Counted like the visit of the Module node.
+            self.__sum += 1
+            first = True
+            try:
+                for lineno, text in iter_chunks(lines):
+                    with self.__timer("parse"):
+                        try:
+                            chunk = ast.parse(text, filename)
+                        except SyntaxError as e:
+                            if e.lineno is not None:
+                                e.lineno += lineno - 1
+                            if e.end_lineno is not None:
+                                e.end_lineno += lineno - 1
+                            raise
+                    del text
+                    if self.__analyzers:
+                        # Analyzers see the lines of the whole script.
+                        ast.increment_lineno(chunk, lineno - 1)
+                    else:
+                        # Cheaper than renumbering every node.
+                        self.__line_offset = lineno - 1
+                    if first:
+                        # The first chunk holds the module docstring.
+                        self.__set_doc(chunk, "Module", "Module")
+                        first = False
+                    # The last statement of the last chunk is the last
+                    # of the module.
+                    self.__last_node = None
+                    self.__set_last_node(chunk)
+                    stack_buffer = self.__stack_buffer
+                    stack_buffer.clear()
+                    stack_buffer.extend(reversed(chunk.body))
+                    # Statements are freed as they are popped.
+                    del chunk
+                    self.__traverse(stack_buffer)
+                if self.__last_node is not None and self.__line_offset:
+                    ast.increment_lineno(
+                        self.__last_node, self.__line_offset)
+            finally:
+                self.__line_offset = 0
+        if first:
+            self.__set_doc(
+                ast.Module(body=[], type_ignores=[]), "Module", "Module")
+
+    def analyze_lines(
+            self,
+            script: str,
+            start: int,
+            end: int = None,
+            *,
+            is_path: bool = None
+    ) -> "CustomNodeVisitor":
+        """
+        Resets the visitor, parses the script and visits only the
+        top-level statements which overlap the lines start to end,
+        e.g. the lines changed in a diff. The statements are found by
+        binary search over Module.body, so the visit costs the size of
+        the statements, not of the module. A line inside a function or
+        class visits the whole top-level definition, and the lines of
+        its decorators belong to it.
+
+        The cache and the fast path are not used. Give a TreeCache
+        to __init__ so that queries on the same source parse it once.
+        node_count, sum and doc_list only hold the visited statements,
+        and the Module doc is recorded when the first statement
+        is visited. last_node is None.
+
+        Parameters:
+        - script(str): The script or the path to be visited.
+        - start(int): First line of the range, from 1.
+        - end(int): Last line of the range, included (default: start).
+        - is_path(bool): True if script is a path, False if it is
+        a source, None to decide by the script itself.
+
+        Returns:
+        - The visitor itself.
+
+        Raises:
+        - ValueError: start is less than 1 or end is less than start.
+        """
+        if end is None:
+            end = start
+        if start < 1 or end < start:
+            raise ValueError(
+                f"Invalid line range: {start} to {end}.")
+        self.reset()
+        self.script = script
+        self.__is_path = is_path
+        self.__set_ast_tree(script)
+        body = self.tree.body
+        # Statements do not overlap, so both first and end lines
+        # increase along the body.
+        first = bisect_left(
+            body, start, key=lambda node: node.end_lineno)
+        stop = bisect_right(body, end, lo=first, key=_first_line)
+        if first == stop:
+            return self
+        if first == 0:
+            self.__set_doc(self.tree, "Module", "Module")
+        stack = self.__stack_buffer
+        stack.clear()
+        stack.extend(reversed(body[first:stop]))
+        self.__traverse(stack)
+        if self.__categories is not None:
+            self.__node_count.retain(self.__categories)
+        return self
+
+    def register(self, analyzer: ast.NodeVisitor) -> ast.NodeVisitor:
+        """
+        Registers the analyzer. A hosted analyzer has its visit_*
+        methods run in the traversal of this visitor instead of a walk
+        of their own.
+        The handlers of all analyzers are merged into the dispatch
+        table, so N analyses cost about one tree walk.
+
+        While hosted, generic_visit of the analyzer only tells the host
+        to descend, and it is not called for node classes the analyzer
+        has no visit method for. A visit method which does not call it
+        skips the subtree for this analyzer only. Children are visited
+        after the visit method returns, so work which needs them
+        visited goes in a leave_* method of the analyzer, e.g.
+        leave_FunctionDef(node), called once the subtree is done
+        (see generic_visit).
+
+        Hosting is opted into with defer_children = True on the
+        analyzer class, for visit methods which call
+        self.generic_visit last and leave other work to leave_*
+        methods. Other analyzers, and those overriding visit or
+        generic_visit, are walked on their own after the traversal
+        instead, from the same nodes, with their leave_* methods
+        called after the visit method of the node returns.
+
+        Parameters:
+        - analyzer: NodeVisitor object, its results stay on it.
+
+        Returns:
+        - The analyzer.
+        """
+        self.__analyzers.append(analyzer)
+        self.__hosted.append(_is_hostable(analyzer))
+        self.__active.append(True)
+        self.__descends.append(_Descend())
+        # Analyzers may handle expressions, which categories skip.
+        self.__push = _push_children
+        self.__dispatch.clear()
+        self.__dispatch[_Leave] = self.__leave
+        self.__dispatch[_Resume] = self.__resume
+        return analyzer
+
+    @property
+    def analyzers(self) -> tuple[ast.NodeVisitor, ...]:
+        """
+        Property method to get the hosted analyzers.
+
+        Returns:
+        - Tuple of the analyzers in registration order.
+        """
+        return tuple(self.__analyzers)
+
+    def __set_categories(self, categories: Iterable[str]) -> None:
+        """
+        Sets the node classes to dispatch for the requested categories.
+
+        Parameters:
+        - categories: node_count keys to count.
+
+        Raises:
+        - ValueError: categories is empty.
+        """
+        self.__categories = set(categories)
+        if not self.__categories:
+            raise ValueError("categories must not be empty.")
+        # Module is the root, which records the module doc.
+        wanted = {ast.Module}
+        for category in self.__categories:
+            wanted.add(_CATEGORY_NODES.get(category, ast.Call))
+        self.__wanted_nodes = wanted
+        if ast.Call not in wanted:
+            self.__push = _push_statements
+
+    @classmethod
+    def iter_events(
+            cls,
+            script: str,
+            categories: Iterable[str] = None
+    ) -> Iterator[NodeEvent]:
+        """
+        Parses the script and yields a NodeEvent for every counted
+        node while walking the tree, instead of building node_count
+        and doc_list. The consumer can stop early by closing
+        the generator.
+
+        Parameters:
+        - script(str): The script or the path to be visited.
+        - categories: Optional node_count keys to yield events for,
+        see __init__.
+
+        Returns:
+        - Iterator of NodeEvent in visiting order.
+        """
+        visitor = cls(categories=categories)
+        visitor.script = script
+        visitor.__set_ast_tree(script)
+        visitor.__events = []
+        events = visitor.__iter_traverse([visitor.tree])
+        if categories is None:
+            yield from events
+            return
+        wanted = visitor.__categories
+        for event in events:
+            if (event.name if event.kind == "call" else event.kind) in wanted:
+                yield event
+
+    @classmethod
+    def from_path(cls, path: str, *args, **kwargs) -> "CustomNodeVisitor":
+        """
+        Creates the visitor for a file, without guessing whether
+        the string is a path or a source.
+
+        Parameters:
+        - path(str): Path of the file to be visited.
+        - *args, **kwargs: Other arguments of __init__.
+
+        Returns:
+        - CustomNodeVisitor object.
+        """
+        return cls(path, *args, is_path=True, **kwargs)
+
+    @classmethod
+    def from_source(
+            cls, source: str, *args, **kwargs) -> "CustomNodeVisitor":
+        """
+        Creates the visitor for a source string, without making
+        a filesystem call to check whether it is a path.
+
+        Parameters:
+        - source(str): Source to be visited.
+        - *args, **kwargs: Other arguments of __init__.
+
+        Returns:
+        - CustomNodeVisitor object.
+        """
+        return cls(source, *args, is_path=False, **kwargs)
+
+    @property
+    def sum(self) -> int:
+        """
+        Property method to get the value of the 'sum' attribute.
+
+        Returns:
+        - The total count of nodes visited.
+        """
+        return self.__sum
+
+    @sum.setter
+    def sum(self, value: any):
+        """
+        Setter method for 'sum' attribute, raise Attribute error.
+
+        Parameters:
+        - value(any): The value to set (ignored).
+
+        Raises:
+        - AttributeError: This attribute is read-only.
+        """
+        raise AttributeError(CustomNodeVisitor.__read_only_error_text("sum"))
+
+    @property
+    def last_node(self) -> None:
+        """
+        Property method to raise ValueError for "last_node" attribute.
+
+        Raises:
+        - ValueError: Not allowed to access.
+        """
+        raise ValueError(
+            CustomNodeVisitor.__not_allowed_error_text("last_node"))
+
+    @last_node.setter
+    def last_node(self, value: any) -> None:
+        """
+        Property method to raise ValueError for "last_node" attribute.
+
+        Parameters:
+        - value: The value to set (ignored).
+
+        Raises:
+        - ValueError: Not allowed to access.
+        """
+        raise ValueError(
+            CustomNodeVisitor.__not_allowed_error_text("last_node"))
+
+    @property
+    def node_count(self) -> int:
+        """
+        Property method to get the value of the 'node_count' attribute.
+
+        Returns:
+        - Dictionary view of __node_count attribute.
+        """
+        return self.__node_count.as_dict()
+
+    @node_count.setter
+    def node_count(self, value: any):
+        """
+        Setter method for 'node_count' attribute, raise Attribute error.
+
+        Parameters:
+        - value(any): The value to set (ignored).
+
+        Raises:
+        - AttributeError: This attribute is read-only.
+        """
+        raise AttributeError(
+            CustomNodeVisitor.__read_only_error_text("node_count"))
+
+    @property
+    def format_values(self) -> None:
+        """
+        Property method to raise ValueError for "format_values" attribute.
+
+        Raises:
+        - ValueError: Not allowed to access.
+        """
+        raise ValueError(
+            CustomNodeVisitor.__not_allowed_error_text("format_values"))
+
+    @format_values.setter
+    def format_values(self, value: any) -> None:
+        """
+        Property method to raise ValueError for "format_values" attribute.
+
+        Parameters:
+        - value(any): The value to set (ignored).
+
+        Raises:
+        - ValueError: Not allowed to access.
+        """
+        raise ValueError(
+            CustomNodeVisitor.__not_allowed_error_text("format_values"))
+
+    @property
+    def doc_list(self) -> list[dict]:
+        """
+        Property method to get the value of the 'doc_list' attribute.
+        Docstrings are cleaned here if not done yet, use doc_records
+        when only the names are needed.
+
+        Returns:
+        - List of dictionaries with "class", "name" and "doc" keys.
+        """
+        return [record.as_dict() for record in self.__doc_list]
+
+    @property
+    def scope_index(self) -> ScopeIndex | None:
+        """
+        Property method to get the interval index of the definitions
+        visited by the last analysis, e.g. to annotate traceback or
+        coverage lines with their enclosing function.
+
+        Returns:
+        - ScopeIndex object, or None if scopes are not recorded.
+        """
+        if self.__scopes is None:
+            return None
+        if self.__scope_index is None:
+            self.__scope_index = ScopeIndex(self.__scopes)
+        return self.__scope_index
+
+    @property
+    def doc_records(self) -> list[DocRecord]:
+        """
+        Property method to get the DocRecord list,
+        whose docstrings are cleaned on first access.
+
+        Returns:
+        - Copy of __doc_list attribute.
+        """
+        return list(self.__doc_list)
+
+    @doc_list.setter
+    def doc_list(self, value: any):
+        """
+        Setter method for 'doc_list' attribute, raise Attribute error.
+
+        Parameters:
+        - value(any): The value to set (ignored).
+
+        Raises:
+        - AttributeError: This attribute is read-only.
+        """
+        raise AttributeError(
+            CustomNodeVisitor.__read_only_error_text("doc_list"))
+
+    @staticmethod
+    def __not_allowed_error_text(attr: str) -> str:
+        """
+        Static method to provide error text for not allowed attribute access.
+
+        Parameters:
+        - attr(str): The attribute name.
+
+        Returns:
+        - Error message string.
+        """
+        return f"You are not allowed to access '{attr}' attribute."
+
+    @staticmethod
+    def __read_only_error_text(attr: str) -> str:
+        """
+        Staticmethod to provide error text for read_only.
+
+        Parameters:
+        - attr(str): The attribute name.
+
+        Return:
+        - Error message string.
+        """
+        return f"Attribute '{attr}' is read-only."
+
+    def visit(self, node: ast.AST, *args) -> dict[str: int] | None:
+        """
+        Visits the given AST node and returns counts for
+        a specified subset of keys, if provided.
+        The traversal uses an explicit stack instead of recursion,
+        so deeply nested trees never raise RecursionError.
+
+        Parameters:
+        - node: AST node to visit.
+        - *args: Subset of keys to count.
+
+        Returns:
+        - None if no subset keys provided, or a dictionary
+        containing counts for the specified subset keys.
+        """
+        if self.__stack is None:
+            stack = self.__stack_buffer
+            # Nodes may be left over from a visit which raised.
+            stack.clear()
+            stack.append(node)
+        else:
+            # Called from a visit method, the buffer is in use.
+            stack = [node]
+        self.__traverse(stack)
+
+    def generic_visit(self, node: ast.AST) -> None:
+        """
+        A generic visit method that increments
+        the node count and continues the traversal.
+        If defer_children is set, child nodes are pushed onto
+        the traversal stack and visited after the calling visit_*
+        method returns, in the same pre-order as
+        NodeVisitor.generic_visit. Work done after calling this method
+        therefore runs before the children are visited, and work
+        which needs the children visited (e.g. popping a scope pushed
+        by visit_FunctionDef) goes in a leave_* method instead,
+        e.g. leave_FunctionDef(node), which is called once the subtree
+        of the node is done. Otherwise the children are visited before
+        this method returns, on a stack of their own.
+
+        Parameters:
+        - node: AST node to visit.
+        """
+        self.__sum += 1
+        if self.__stack is None or not self.__defer:
+            # Called outside of visit, or the caller works after it.
+            stack = []
+            self.__push(stack, node)
+            self.__traverse(stack)
+        else:
+            self.__push(self.__stack, node)
+
+    def __traverse(self, stack: list[ast.AST]) -> None:
+        """
+        Visits nodes until the given stack is empty.
+        Nested calls (visit called from a visit_* method)
+        run on their own stack and restore the outer one.
+
+        Parameters:
+        - stack: Nodes to visit, the last one is visited first.
+        """
+        outer_stack = self.__stack
+        self.__stack = stack
+        dispatch = self.__dispatch
+        push = self.__push
+        hosting = outer_stack is None and self.__analyzers
+        if hosting:
+            self.__host(True)
+            # Nodes the analyzers which are not hosted walk from.
+            roots = () if all(self.__hosted) else stack[::-1]
+        try:
+            while stack:
+                node = stack.pop()
+                try:
+                    visitor = dispatch[node.__class__]
+                except KeyError:
+                    visitor = self.__resolve_visitor(node.__class__)
+                if visitor is None:
+                    self.__sum += 1
+                    push(stack, node)
+                else:
+                    visitor(node)
+        finally:
+            self.__stack = outer_stack
+            if hosting:
+                self.__host(False)
+        if hosting:
+            for slot, analyzer in enumerate(self.__analyzers):
+                if not self.__hosted[slot]:
+                    for root in roots:
+                        _walk(analyzer, root)
+
+    def __host(self, start: bool) -> None:
+        """
+        Replaces generic_visit of the analyzers with their _Descend
+        recorders at the start of a traversal, and restores it
+        at the end.
+
+        Parameters:
+        - start(bool): True at the start, False at the end.
+        """
+        for slot, analyzer in enumerate(self.__analyzers):
+            if not self.__hosted[slot]:
+                continue
+            if start:
+                self.__active[slot] = True
+                analyzer.generic_visit = self.__descends[slot]
+            else:
+                del analyzer.generic_visit
+
+    def __resume(self, marker: _Resume) -> None:
+        """
+        Re-enables the analyzer of the marker, whose skipped subtree
+        is done.
+
+        Parameters:
+        - marker: _Resume popped from the stack.
+        """
+        self.__active[marker.slot] = True
+
+    def __chain(
+            self,
+            visitor: callable,
+            handlers: tuple[tuple[int, callable], ...]
+    ) -> callable:
+        """
+        Returns the merged visit method of a node class, which runs
+        the handlers of the active analyzers, puts _Leave markers
+        for their leave methods below the children, then runs the own
+        visit method (or counts the node inline).
+
+        Parameters:
+        - visitor: Own visit method, or None to count inline.
+        - handlers: Tuples of the analyzer slot, its visit method and
+        its leave method, either of which may be None.
+
+        Returns:
+        - Function taking the node.
+        """
+        active = self.__active
+        descends = self.__descends
+
+        def visit_hosted(node: ast.AST) -> None:
+            stack = self.__stack
+            depth = len(stack)
+            # The analyzers first, the own visit method may visit
+            # the children before returning (see defer_children).
+            for slot, handler, leave in handlers:
+                if not active[slot]:
+                    continue
+                if handler is not None:
+                    descend = descends[slot]
+                    descend.called = False
+                    handler(node)
+                    if not descend.called:
+                        active[slot] = False
+                        # Below the children, popped after the subtree.
+                        stack.insert(depth, _Resume(slot))
+                if leave is not None:
+                    stack.insert(depth, _Leave(leave, node))
+            if visitor is None:
+                self.__sum += 1
+                self.__push(stack, node)
+            else:
+                visitor(node)
+        return visit_hosted
+
+    def __with_leave(self, visitor: callable, leave: callable) -> callable:
+        """
+        Returns the visit method of a node class with a leave method,
+        which puts a _Leave marker below the children of the node
+        before visiting it.
+
+        Parameters:
+        - visitor: Visit method.
+        - leave: Leave method, called with the node after its subtree.
+
+        Returns:
+        - Function taking the node.
+        """
+        def visit_and_leave(node: ast.AST) -> None:
+            self.__stack.append(_Leave(leave, node))
+            visitor(node)
+        return visit_and_leave
+
+    def __leave(self, marker: _Leave) -> None:
+        """
+        Calls the leave method of the marker, whose subtree is done.
+
+        Parameters:
+        - marker: _Leave popped from the stack.
+        """
+        marker.handler(marker.node)
+
+    def __iter_traverse(self, stack: list[ast.AST]) -> Iterator[NodeEvent]:
+        """
+        Same as __traverse, but yields the events recorded by
+        each visit method as soon as it returns.
+
+        Parameters:
+        - stack: Nodes to visit, the last one is visited first.
+
+        Returns:
+        - Iterator of NodeEvent.
+        """
+        outer_stack = self.__stack
+        self.__stack = stack
+        dispatch = self.__dispatch
+        push = self.__push
+        events = self.__events
+        try:
+            while stack:
+                node = stack.pop()
+                try:
+                    visitor = dispatch[node.__class__]
+                except KeyError:
+                    visitor = self.__resolve_visitor(node.__class__)
+                if visitor is None:
+                    self.__sum += 1
+                    push(stack, node)
+                    continue
+                visitor(node)
+                if events:
+                    yield from events
+                    events.clear()
+        finally:
+            self.__stack = outer_stack
+
+    def __resolve_visitor(self, node_class: type) -> callable:
+        """
+        Resolves and caches the visit method for the node class,
+        which NodeVisitor.visit looks up by name for every node.
+        The lookup goes through the instance, so visit_* methods
+        overridden in subclasses are respected.
+
+        Parameters:
+        - node_class: Class of the AST node.
+
+        Returns:
+        - Bound visit method, or None if the node is counted inline
+        because neither visit_*, leave_* nor generic_visit is
+        overridden, or the node class is not requested by the
+        categories. With instrumentation, the method is wrapped to be
+        timed and nodes are never counted inline.
+        """
+        visitor = getattr(self, 'visit_' + node_class.__name__, None)
+        leave = getattr(self, 'leave_' + node_class.__name__, None)
+        if (self.__wanted_nodes is not None
+                and node_class not in self.__wanted_nodes):
+            # Not requested by the categories.
+            visitor = leave = None
+            if (self.__scopes is not None
+                    and node_class in _DEFINITION_KINDS):
+                visitor = self.__visit_scope
+        if visitor is None and (
+                leave is not None
+                or type(self).generic_visit is not
+                CustomNodeVisitor.generic_visit
+                or self.__instrument is not None):
+            visitor = self.generic_visit
+        if self.__instrument is not None:
+            visitor = self.__instrument.wrap(visitor.__name__, visitor)
+        if leave is not None:
+            visitor = self.__with_leave(visitor, leave)
+        if self.__analyzers:
+            visitor = self.__resolve_hosted(node_class, visitor)
+        self.__dispatch[node_class] = visitor
+        return visitor
+
+    def __resolve_hosted(
+            self, node_class: type, visitor: callable) -> callable:
+        """
+        Merges the visit and leave methods of the hosted analyzers
+        for the node class with the own visit method.
+
+        Parameters:
+        - node_class: Class of the AST node.
+        - visitor: Own visit method, or None to count inline.
+
+        Returns:
+        - Merged visit method, or the own one if no analyzer
+        handles the node class.
+        """
+        name = 'visit_' + node_class.__name__
+        leave_name = 'leave_' + node_class.__name__
+        handlers = []
+        for slot, analyzer in enumerate(self.__analyzers):
+            if not self.__hosted[slot]:
+                continue
+            handler = getattr(analyzer, name, None)
+            leave = getattr(analyzer, leave_name, None)
+            if handler is None and leave is None:
+                continue
+            if self.__instrument is not None and handler is not None:
+                handler = self.__instrument.wrap(
+                    f"{type(analyzer).__name__}.{name}", handler)
+            handlers.append((slot, handler, leave))
+        if not handlers:
+            return visitor
+        return self.__chain(visitor, tuple(handlers))
+
+    def __is_script_path(self, script: str) -> bool:
+        """
+        Decides whether the script is a path or a source.
+
+        Parameters:
+        - script(str): The script or the path.
+
+        Returns:
+        - True if script is a path, False otherwise.
+        """
+        if self.__is_path is not None:
+            return self.__is_path
+        # A path has no line break, so sources skip the syscall.
+        return (
+            '\n' not in script and len(script) < _PATH_MAX
+            and os.path.exists(script))
+
+    def __set_ast_tree(self, script: str) -> None:
+        """
+        Parse and set ast tree according to script type.
+        If script is path, the file bytes are parsed, so that
+        the PEP 263 encoding declaration is honoured,
+        else if string, it will be parsed and set.
+        """
+        with ExitStack() as stack:
+            source, filename = self.__load_script(script, stack)
+            with self.__timer("parse"):
+                self.tree = self.__parse(source, filename)
+
+    def __parse(self, source: str | bytes, filename: str) -> ast.Module:
+        """
+        Parses the source, through the tree cache if given.
+
+        Parameters:
+        - source: Source string, or bytes-like object of a file.
+        - filename(str): File name for syntax errors.
+
+        Returns:
+        - Module node.
+        """
+        if self.__tree_cache is None:
+            return ast.parse(source, filename)
+        return self.__tree_cache.parse(source, filename)
+
+    def __load_script(
+            self, script: str, stack: ExitStack) -> tuple[str | bytes, str]:
+        """
+        Loads the source of the script.
+
+        Parameters:
+        - script(str): The script or the path.
+        - stack: ExitStack which keeps the file open.
+
+        Returns:
+        - Tuple of the source and the file name for syntax errors.
+        """
+        if not self.__is_script_path(script):
+            return script, "<unknown>"
+        with self.__timer("io"):
+            return stack.enter_context(open_source(script)), script
+
+    def __timer(self, name: str) -> nullcontext:
+        """
+        Returns the context manager to time a phase.
+
+        Parameters:
+        - name(str): Name of the phase.
+
+        Returns:
+        - Timer of the Instrumentation, or a no-op context manager
+        if instrumentation is disabled.
+        """
+        if self.__instrument is None:
+            return _NULL_TIMER
+        return self.__instrument.timer(name)
+
+    def __analyze_cached(self, script: str, cache: "ResultCache") -> None:
+        """
+        Restores the results from the cache, or parses and visits
+        the script and stores the results in the cache.
+
+        Parameters:
+        - script(str): The script or the path to be visited.
+        - cache(ResultCache): Cache of results.
+        """
+        with ExitStack() as stack:
+            source, filename = self.__load_script(script, stack)
+            self.__analyze_source(source, cache, filename)
+
+    def __analyze_source(
+            self,
+            source: str | bytes,
+            cache: "ResultCache",
+            filename: str = "<unknown>"
+    ) -> None:
+        """
+        Restores the results of the source from the cache,
+        or parses and visits it and stores the results.
+
+        Parameters:
+        - source: Source string, or bytes-like object of a file.
+        - cache(ResultCache): Cache of results.
+        - filename(str): File name for syntax errors.
+        """
+        with self.__timer("cache"):
+            key = cache.key(source)
+            if self.__categories is not None:
+                key += ":" + ",".join(sorted(self.__categories))
+            result = cache.get(key)
+        if result is not None:
+            self.__node_count.update(result["node_count"])
+            self.__sum = result["sum"]
+            self.__doc_list.extend(
+                DocRecord(doc["class"], doc["name"], doc["doc"])
+                for doc in result["doc_list"])
+            self.__format_specifiers.update(result["format_specifiers"])
+            return
+        with self.__timer("parse"):
+            self.tree = self.__parse(source, filename)
+        self.visit(self.tree)
+        with self.__timer("cache"):
+            cache.put(key, {
+                "node_count": self.__node_count.as_dict(),
+                "sum": self.__sum,
+                "doc_list": self.doc_list,
+                "format_specifiers": sorted(self.__format_specifiers)})
+
+    def dump(self, indent: int = 4) -> str:
+        """
+        Returns the AST dump of the script.
+
+        Args:
+        - indent (int): Number of spaces to use for indentation (default: 4).
+
+        Returns:
+        - str: AST dump of the script.
+
+        Raises:
+        - ValueError: No tree is kept, e.g. in the low-memory mode.
+        """
+        if self.tree is None:
+            raise ValueError("No tree is kept to dump.")
+        return ast.dump(self.tree, indent=indent)
+
+    def get_counts_subset(
+            self, *key_list: list[str]) -> dict[str: int]:
+        """
+        Returns a dictionary containing counts for
+        the specified subset of keys.
+
+        Parameters:
+        - *key_list: Subset of keys to count.
+
+        Returns:
+        - Dictionary with counts for the specified keys.
+        """
+        return self.__node_count.subset(*key_list)
+
+    def format_specifier_check(self, specifier: str = "") -> bool:
+        """
+        Checks if a specific format specifier is present in any of
+        the str.format strings and f-strings, in constant time.
+        A specifier is a field name ("0", "name", "obj.attr"),
+        a conversion ("!r") or a format spec (">10", ".2f").
+        Field names of f-strings are recorded for plain names only.
+
+        Parameters:
+        - specifier: Format specifier to check.
+
+        Returns:
+        - True if the specifier is present, False otherwise.
+
+        Raises:
+        - ValueError: specifier is empty.
+        """
+        if specifier == '':
+            raise ValueError("specifier argument is missing.")
+        return specifier in self.__format_specifiers
+
+    def __set_last_node(self, node: ast.AST) -> None:
+        """
+        Sets the last_node attribute to the last child node
+        of the given AST node's body.
+
+        Parameters:
+        - node: AST node to determine the last child node.
+        """
+
+        # Assume that the visitation process starts with the visit method.
+        # Empty modules (e.g. bare __init__.py) and leaf statements
+        # such as a trailing "pass" have no child node to remember.
+        if node.body:
+            children = list(ast.iter_child_nodes(node.body[-1]))
+            if children:
+                self.__last_node = children[-1]
+
+    def __count(self, key: str, node: ast.AST, name: str = None) -> None:
+        """
+        Increments the count of the key, or records an event
+        while iter_events is running.
+
+        Parameters:
+        - key(str): Key of node_count.
+        - node: Counted AST node.
+        - name(str): Defined name for the event, if any.
+        """
+        if self.__events is None:
+            self.__node_count.increment(key)
+        else:
+            self.__events.append(NodeEvent(key, name, node.lineno))
+
+    def __add_scope(self, kind: str, node: ast.AST) -> None:
+        """
+        Records the span of the definition if scopes are recorded.
+
+        Parameters:
+        - kind(str): node_count key of the definition.
+        - node: FunctionDef, AsyncFunctionDef or ClassDef node.
+        """
+        if self.__scopes is not None:
+            offset = self.__line_offset
+            self.__scopes.append((
+                kind, node.name, node.lineno + offset,
+                node.end_lineno + offset))
+
+    def __visit_scope(self, node: ast.AST) -> None:
+        """
+        Visits a definition which is not requested by the categories,
+        only to record its span.
+
+        Parameters:
+        - node: FunctionDef, AsyncFunctionDef or ClassDef node.
+        """
+        self.__add_scope(_DEFINITION_KINDS[node.__class__], node)
+        self.generic_visit(node)
+
+    def __count_call(self, name: str, node: ast.AST) -> None:
+        """
+        Increments the count of the called name, or records
+        a "call" event while iter_events is running.
+
+        Parameters:
+        - name(str): Called function or method name.
+        - node: Call node in the AST.
+        """
+        if self.__events is None:
+            self.__node_count.increment(name)
+        else:
+            self.__events.append(NodeEvent("call", name, node.lineno))
+
+    def __add_format_string(self, receiver: ast.AST) -> None:
+        """
+        Records the specifiers of the receiver of a .format call.
+        Only string literals are known before run time, other receivers
+        (names, attributes, bytes) are skipped, as are malformed
+        format strings which would fail at run time.
+
+        Parameters:
+        - receiver: Receiver node of the .format call.
+        """
+        if not (isinstance(receiver, ast.Constant)
+                and isinstance(receiver.value, str)):
+            return
+        try:
+            specifiers = set(_format_specifiers(receiver.value))
+        except ValueError:
+            return
+        self.__format_specifiers.update(specifiers)
+
+    def __set_doc(
+            self, node: ast.AST,
+            cls_name: str = None,
+            mod_name: str = None
+    ) -> None:
+        if self.__events is not None:
+            # Streaming mode does not hold any results.
+            return
+        with self.__timer("set_doc"):
+            self.__doc_list.append(DocRecord.from_node(
+                node,
+                cls_name if cls_name else node.__class__.__name__,
+                mod_name if mod_name else node.name))
+
+    # *** visit_classname methods from here ***
+
+    def visit_Module(self, node):
+        """
+        Visits a Module node and counts method or function calls.
+        If modele doc doesn't start from the first line,
+        None will be set.
+
+        Parameters:
+        - node: Module node in the AST.
+        """
+        if self.__last_node is None:
+            self.__set_last_node(node)
+        if not self.__doc_list:
+            self.__set_doc(node, "Module", "Module")
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.AST) -> None:
+        """
+        Visits a Call node and counts method or function calls.
+
+        Parameters:
+        - node: Call node in the AST.
+        """
+        if isinstance(node.func, ast.Attribute):
+            # Handling calls to the method.
+            self.__count_call(node.func.attr, node)
+            if node.func.attr == 'format' and self.__events is None:
+                self.__add_format_string(node.func.value)
+        elif isinstance(node.func, ast.Name):
+            # Assuming simple function calls.
+            self.__count_call(node.func.id, node)
+        self.generic_visit(node)
+
+    def visit_For(self, node):
+        """
+        Visits a For node and counts occurrences.
+
+        Parameters:
+        - node: For node in the AST.
+        """
+        self.__count("for", node)
+        self.generic_visit(node)
+
+    def visit_While(self, node):
+        """
+        Visits a While node and counts occurrences.
+
+        Parameters:
+        - node: While node in the AST.
+        """
+        self.__count("while", node)
+        self.generic_visit(node)
+
+    def visit_Import(self, node):
+        """
+        Visits an Import node and counts occurrences.
+
+        Parameters:
+        - node: Import node in the AST.
+        """
+        self.__count("import", node)
+        self.generic_visit(node)
+
+    def visit_Try(self, node):
+        """
+        Visits an Import node and counts occurrences.
+
+        Parameters:
+        - node: Import node in the AST.
+        """
+        self.__count("try", node)
+        self.generic_visit(node)
+
+    def visit_Return(self, node):
+        """
+        Visits an Import node and counts occurrences.
+
+        Parameters:
+        - node: Import node in the AST.
+        """
+        self.__count("return", node)
+        self.generic_visit(node)
+
+    def visit_Assign(self, node):
+        """
+        Visits an Assign node and counts occurrences.
+
+        Parameters:
+        - node: Assign node in the AST.
+        """
+        self.__count("assign", node)
+        self.generic_visit(node)
+
+    def visit_AnnAssign(self, node):
+        """
+        Visits an AnnAssign node and counts occurrences.
+
+        Parameters:
+        - node: AnnAssign node in the AST.
+        """
+        self.__count("ann_assign", node)
+        self.generic_visit(node)
+
+    def visit_AugAssign(self, node):
+        """
+        Visits an AugAssign node and counts occurrences.
+
+        Parameters:
+        - node: AugAssign node in the AST.
+        """
+        self.__count("aug_assign", node)
+        self.generic_visit(node)
+
+    def visit_FunctionDef(self, node):
+        """
+        Visits an FunctionDef node and counts occurrences.
+
+        Parameters:
+        - node: FunctionDef node in the AST.
+        """
+        self.__count("function_def", node, node.name)
+        self.__add_scope("function_def", node)
+        self.__set_doc(node)
+        self.generic_visit(node)
+
+    def visit_AsyncFunctionDef(self, node):
+        """
+        Visits an AsyncFunctionDef node and counts occurrences.
+
+        Parameters:
+        - node: AsyncFunctionDef node in the AST.
+        """
+        self.__count("async_function_def", node, node.name)
+        self.__add_scope("async_function_def", node)
+        self.__set_doc(node)
+        self.generic_visit(node)
+
+    def visit_ClassDef(self, node):
+        """
+        Visits an ClassDef node and counts occurrences.
+
+        Parameters:
+        - node: ClassDef node in the AST.
+        """
+        self.__count("class_def", node, node.name)
+        self.__add_scope("class_def", node)
+        self.__set_doc(node)
+        self.generic_visit(node)
+
+    def visit_JoinedStr(self, node):
+        """
+        Visits a JoinedStr node (f-string) and records the specifiers
+        of its replacement fields. A format spec holding nested fields
+        is left to the visit of its own JoinedStr node.
+
+        Parameters:
+        - node: JoinedStr node in the AST.
+        """
+        if self.__events is None:
+            specifiers = self.__format_specifiers
+            for value in node.values:
+                if not isinstance(value, ast.FormattedValue):
+                    continue
+                if isinstance(value.value, ast.Name):
+                    specifiers.add(value.value.id)
+                if value.conversion != -1:
+                    specifiers.add("!" + chr(value.conversion))
+                spec = value.format_spec
+                if spec is not None and spec.values and all(
+                        isinstance(part, ast.Constant)
+                        for part in spec.values):
+                    specifiers.add(
+                        "".join(part.value for part in spec.values))
+        self.generic_visit(node)